@@ -1,12 +1,14 @@
 import json
 import re
-from copy import deepcopy
 from datetime import datetime, timedelta
+from os import path
+from types import MappingProxyType
 from typing import Dict
 
-from bgstally.constants import FILE_SUFFIX, CheckStates
+from bgstally.constants import FILE_SUFFIX, FILE_SUFFIX_LOG, CheckStates, MissionCategory
 from bgstally.debug import Debug
 from bgstally.missionlog import MissionLog
+from bgstally.savemanager import FileWrite
 from bgstally.state import State
 from bgstally.tick import Tick
 from bgstally.utils import _, __
@@ -17,6 +19,20 @@ DATETIME_FORMAT_TITLE = "%Y-%m-%d %H:%M:%S"
 STATES_WAR = ['War', 'CivilWar']
 STATES_ELECTION = ['Election']
 
+# INF value of each entry in a faction's MissionPoints and MissionPointsSecondary. 'm' is manually entered INF, counted as +1
+MISSION_POINTS_WEIGHTS = {'1': 1, '2': 2, '3': 3, '4': 4, '5': 5, 'm': 1}
+# Faction counters that are single integers
+FACTION_INT_COUNTERS = ['BlackMarketProfit', 'Bounties', 'CartData', 'ExoData', 'CombatBonds', 'MissionFailed', 'Murdered', 'GroundMurdered', 'Scenarios']
+# Faction counters that are dicts of integers
+FACTION_DICT_COUNTERS = ['MissionPoints', 'MissionPointsSecondary', 'SpaceCZ', 'GroundCZ', 'SandR']
+
+# Number of change log records appended before we write a full snapshot and start a new log
+ACTIVITY_LOG_MAX_RECORDS = 100
+# Activity files are read in chunks of this size when only the header data is needed
+ACTIVITY_HEADER_CHUNK_SIZE = 4096
+# Matches the start of the systems data in an activity file, which is always stored after the header data
+RE_ACTIVITY_SYSTEMS_KEY = re.compile(r',\s*"systems"\s*:')
+
 # Missions that we count as +1 INF in Elections even if the Journal reports no +INF
 MISSIONS_ELECTION = [
     'Mission_AltruismCredits_name',
@@ -76,6 +92,29 @@ MISSIONS_TW_REACTIVATE = [
     'Mission_TW_OnFoot_Reboot_Occupied_MB_name'
 ]
 
+
+def _build_mission_categories() -> MappingProxyType:
+    """
+    Build a read-only lookup of mission name -> MissionCategory flags from the mission lists above. A mission that
+    appears in more than one list has all the relevant flags set. Missions that are not in any list are absent.
+    """
+    categories:dict = {}
+
+    for category, mission_names in [(MissionCategory.ELECTION, MISSIONS_ELECTION),
+                                    (MissionCategory.WAR, MISSIONS_WAR),
+                                    (MissionCategory.TW_COLLECT, MISSIONS_TW_COLLECT),
+                                    (MissionCategory.TW_EVAC_LOW, MISSIONS_TW_EVAC_LOW),
+                                    (MissionCategory.TW_EVAC_MED, MISSIONS_TW_EVAC_MED),
+                                    (MissionCategory.TW_EVAC_HIGH, MISSIONS_TW_EVAC_HIGH),
+                                    (MissionCategory.TW_MASSACRE, MISSIONS_TW_MASSACRE),
+                                    (MissionCategory.TW_REACTIVATE, MISSIONS_TW_REACTIVATE)]:
+        for mission_name in mission_names:
+            categories[mission_name] = categories.get(mission_name, MissionCategory.NONE) | category
+
+    return MappingProxyType(categories)
+
+MISSION_CATEGORIES: MappingProxyType = _build_mission_categories()
+
 SPACECZ_PILOTNAMES_CAPTAIN = [
     '$LUASC_Scenario_Warzone_NPC_WarzoneGeneral_Emp;',
     '$LUASC_Scenario_Warzone_NPC_WarzoneGeneral_Fed;',
@@ -112,7 +151,8 @@ class Activity:
     User activity for a single tick
 
     Activity is stored in the self.systems Dict, with key = SystemAddress and value = Dict containing the system name and a Dict of
-    factions with their activity
+    factions with their activity. SystemAddresses are always stored as str, both as keys and in the system data, so lookups
+    using a SystemAddress from the journal must convert it with str() first.
     """
 
     def __init__(self, bgstally, tick: Tick = None, sample: bool = False):
@@ -126,12 +166,18 @@ class Activity:
         self.bgstally = bgstally
         if tick == None: tick = Tick(self.bgstally)
 
-        # Stored data. Remember to modify __deepcopy__(), _as_dict() and _from_dict() if these are changed or new data added.
+        # Path to the file to load our data from on first access, if only the header data has been loaded
+        self.lazy_filepath: str|None = None
+
+        # Stored data. Remember to modify _as_dict() and _from_dict() if these are changed or new data added.
         self.tick_id: str = tick.tick_id
         self.tick_time: datetime = tick.tick_time
         self.tick_forced: bool = False
         self.discord_webhook_data:dict = {} # key = webhook uuid, value = dict containing webhook data
         self.discord_notes: str = ""
+        self.log_generation: int = 0 # Incremented on each full snapshot, change log records from older generations are ignored
+
+        # True if a full snapshot is needed on next save
         self.dirty: bool = False
 
         if sample:
@@ -139,8 +185,12 @@ class Activity:
         else:
             self.systems: dict = {}
 
-        # Non-stored instance data. Remember to modify __deepcopy__() if these are changed or new data added.
+        # Non-stored instance data
         self.megaship_pat:re.Pattern = re.compile("^[a-z]{3}-[0-9]{3} ")  # e.g. kar-314 aquarius-class tanker
+        self.dirty_systems: set = set() # Addresses of systems changed since the last save, appended to the change log on next save
+        self.zero_activity_pending: set = set() # Addresses of systems changed since their zero activity flag was last updated
+        self.log_records: int = 0 # Number of records in the change log since the last full snapshot
+        self.file_size: int|None = None # Size of the activity file and change log once all prepared writes are made, None if not known
 
 
     def load_legacy_data(self, filepath: str):
@@ -161,31 +211,147 @@ class Activity:
                     for faction in legacysystem['Factions']:
                         factions[faction['Faction']] = faction  # Just convert List to Dict, with faction name as key
 
-                    self.systems[str(legacysystem['SystemAddress'])] = self._get_new_system_data(legacysystem['System'], str(legacysystem['SystemAddress']), factions)
+                    self._add_system(str(legacysystem['SystemAddress']), self._get_new_system_data(legacysystem['System'], str(legacysystem['SystemAddress']), factions))
             self.recalculate_zero_activity()
 
 
-    def load(self, filepath: str):
+    @property
+    def systems(self) -> dict:
         """
-        Load an activity file
+        The activity data for all systems, keyed by SystemAddress. Loaded from file on first access if this Activity was lazily loaded.
         """
-        try:
-            with open(filepath) as activityfile:
-                self._from_dict(json.load(activityfile))
-                self.recalculate_zero_activity()
-        except Exception as e:
-            Debug.logger.info(f"Unable to load {filepath}")
+        if self.lazy_filepath is not None: self._load_lazy_data()
+        return self._systems
+
+
+    @systems.setter
+    def systems(self, systems: dict):
+        self._systems = systems
+        self._system_names = None
+
+
+    @property
+    def discord_webhook_data(self) -> dict:
+        """
+        Discord post data, key = webhook uuid, value = dict containing webhook data. Loaded from file on first access if this Activity was lazily loaded.
+        """
+        if self.lazy_filepath is not None: self._load_lazy_data()
+        return self._discord_webhook_data
+
+
+    @discord_webhook_data.setter
+    def discord_webhook_data(self, discord_webhook_data: dict):
+        self._discord_webhook_data = discord_webhook_data
+
+
+    @property
+    def discord_notes(self) -> str:
+        """
+        The user's Discord notes. Loaded from file on first access if this Activity was lazily loaded.
+        """
+        if self.lazy_filepath is not None: self._load_lazy_data()
+        return self._discord_notes
+
 
+    @discord_notes.setter
+    def discord_notes(self, discord_notes: str):
+        self._discord_notes = discord_notes
 
-    def save(self, filepath: str):
+
+    def load(self, filepath: str, lazy: bool = False):
         """
-        Save to an activity file
+        Load an activity file, then replay any changes from its change log. If lazy is True, only the header data (tick
+        information, Discord data) is read now, and systems are loaded from the file the first time they are accessed.
+        If there is only a change log, because the activity file was never written, our tick information is kept and the
+        systems are loaded from the change log alone.
         """
-        if not self.dirty: return
+        log_filepath:str = self._get_log_filepath(filepath)
+
+        if path.exists(filepath) or not path.exists(log_filepath):
+            if lazy and self._load_header(filepath):
+                self.lazy_filepath = filepath
+                return
+
+            try:
+                with open(filepath) as activityfile:
+                    self._from_dict(json.load(activityfile))
+            except Exception as e:
+                Debug.logger.info(f"Unable to load {filepath}")
+                return
+        else:
+            # Take a full snapshot on next save, so the activity file is written
+            self.dirty = True
+
+        self._replay_log(log_filepath, not path.exists(filepath))
+        self.recalculate_zero_activity()
+
+
+    def load_from_index(self, filepath: str, tick_id: str, index_entry: dict):
+        """
+        Populate the tick information from an activity index entry without reading the activity file. All other data is
+        loaded from the file the first time it is accessed.
+        """
+        self.tick_id = tick_id
+        self.tick_time = datetime.strptime(index_entry['ticktime'], DATETIME_FORMAT_ACTIVITY)
+        self.tick_forced = index_entry.get('tickforced', False)
+        self.lazy_filepath = filepath
+
+
+    def get_index_entry(self, filepath: str) -> dict:
+        """
+        Return the activity index entry for this Activity, which has been saved to filepath
+        """
+        filesize:int|None = self.file_size
+        if filesize is None:
+            filesize = path.getsize(filepath) if path.exists(filepath) else 0
+            log_filepath:str = self._get_log_filepath(filepath)
+            if path.exists(log_filepath): filesize += path.getsize(log_filepath)
+
+        index_entry:dict = {
+            'ticktime': self.tick_time.strftime(DATETIME_FORMAT_ACTIVITY),
+            'tickforced': self.tick_forced,
+            'filesize': filesize}
+
+        # Counting the systems would load all our data, so the count is left out until the data has been loaded
+        if self.lazy_filepath is None: index_entry['systemcount'] = len(self._systems)
+
+        return index_entry
+
+
+    def prepare_save(self, filepath: str) -> list[FileWrite]:
+        """
+        Prepare to save to an activity file. If only individual systems have changed, append them to the change log rather
+        than rewriting the whole file. A full snapshot is written periodically, and whenever non-system data has changed.
+        Returns an empty list if nothing has changed.
+        """
+        if not self.dirty and not self.dirty_systems: return []
+
+        # Make sure we have all our data before writing any of it
+        if self.lazy_filepath is not None: self._load_lazy_data()
+
+        log_filepath:str = self._get_log_filepath(filepath)
+
+        # The change log only holds systems, so the first save must always write the full activity file
+        if self.dirty or not path.exists(filepath) or (self.dirty_systems and self.log_records >= ACTIVITY_LOG_MAX_RECORDS):
+            self.log_generation += 1
+            text:str = json.dumps(self._as_dict(), separators=(',', ':'))
+            writes:list[FileWrite] = [FileWrite(filepath, text), FileWrite(log_filepath, None)]
 
-        with open(filepath, 'w') as activityfile:
-            json.dump(self._as_dict(), activityfile)
             self.dirty = False
+            self.dirty_systems.clear()
+            self.log_records = 0
+            self.file_size = len(text)
+        else:
+            record:dict = {'gen': self.log_generation,
+                           'systems': {system_address: self.systems[system_address] for system_address in self.dirty_systems if system_address in self.systems}}
+            text:str = json.dumps(record, separators=(',', ':')) + "\n"
+            writes:list[FileWrite] = [FileWrite(log_filepath, text, append=True)]
+
+            self.dirty_systems.clear()
+            self.log_records += 1
+            if self.file_size is not None: self.file_size += len(text)
+
+        return writes
 
 
     def get_filename(self) -> str:
@@ -195,6 +361,13 @@ class Activity:
         return self.tick_id + FILE_SUFFIX
 
 
+    def get_log_filename(self) -> str:
+        """
+        Return the change log filename for this Activity
+        """
+        return self.tick_id + FILE_SUFFIX_LOG
+
+
     def get_title(self, discord:bool = False) -> str:
         """
         Get the title for this activity
@@ -209,7 +382,7 @@ class Activity:
         """
         Get an ordered list of the systems we are tracking, with the current system first, followed by those with activity, and finally those without
         """
-        return sorted(self.systems.keys(), key=lambda x: (str(x) != self.bgstally.state.current_system_id, self.systems[x]['zero_system_activity'], self.systems[x]['System']))
+        return sorted(self.systems.keys(), key=lambda x: (x != self.bgstally.state.current_system_id, self.systems[x]['zero_system_activity'], self.systems[x]['System']))
 
 
     def get_current_system(self) -> dict | None:
@@ -223,10 +396,10 @@ class Activity:
         """
         Retrieve the data for a system by its name, or None if system not found
         """
-        for system in self.systems.values():
-            if system['System'] == system_name: return system
+        system_address:str|None = self._get_system_address(system_name)
+        if system_address is None: return None
 
-        return None
+        return self.systems.get(system_address)
 
 
     def get_system_by_address(self, system_address:str) -> dict | None:
@@ -253,32 +426,38 @@ class Activity:
         return result
 
 
-    def clear_activity(self, mission_log: MissionLog):
+    def carry_forward(self, previous_activity: 'Activity', mission_log: MissionLog):
         """
-        Clear down all activity. If there is a currently active mission in a system or it's the current system the player is in,
-        or the system has had search and rescue items collected there, only zero the activity, otherwise delete the system completely.
+        Populate with zeroed copies of the systems in a previous Activity that need carrying forward into this tick: those
+        with a currently active mission, the current system the player is in, and those that have had search and rescue
+        items collected there. Only these systems are copied, so the cost is proportional to what is carried forward rather
+        than to the total activity in previous_activity.
         """
         self.dirty = True
-        mission_systems = mission_log.get_active_systems()
-
-        # Need to convert keys to list so we can delete as we iterate
-        for system_address in list(self.systems.keys()):
-            system = self.systems[system_address]
-            # Note that the missions log historically stores system name so we check for that, not system address.
-            # Potential for very rare bug here for systems with duplicate names.
-            if system['System'] in mission_systems or \
-                    self.bgstally.state.current_system_id == system_address or \
-                    sum(int(d['scooped']) for d in system['TWSandR'].values()) > 0:
-                # The system has a current mission, or it's the current system, or it has TWSandR scoops - zero, don't delete
-                for faction_name, faction_data in system['Factions'].items():
-                    system['Factions'][faction_name] = self._get_new_faction_data(faction_name, faction_data['FactionState'])
-                system['TWKills'] = self._get_new_tw_kills_data()
-                # Note: system['TWSandR'] scooped data is carried forward, delivered data is cleared
-                for d in system['TWSandR'].values():
-                    d['delivered'] = 0
-            else:
-                # Delete the whole system
-                del self.systems[system_address]
+        mission_system_addresses:set = previous_activity._get_system_addresses(mission_log.get_active_systems())
+
+        for system_address, system in previous_activity.systems.items():
+            if not self._is_system_retained(system_address, system, mission_system_addresses): continue
+
+            # All other system-level values are immutable, so a shallow copy is enough
+            new_system:dict = dict(system)
+            new_system['Factions'] = {faction_name: self._get_new_faction_data(faction_name, faction_data['FactionState'])
+                                      for faction_name, faction_data in system['Factions'].items()}
+            new_system['TWKills'] = self._get_new_tw_kills_data()
+            # Note: TWSandR scooped data is carried forward, delivered data is cleared
+            new_system['TWSandR'] = {key: {'scooped': d['scooped'], 'delivered': 0} for key, d in system['TWSandR'].items()}
+            new_system['zero_system_activity'] = True
+
+            self._add_system(system_address, new_system)
+
+
+    def _is_system_retained(self, system_address: str, system: dict, mission_system_addresses: set) -> bool:
+        """
+        Return True if a system should be carried forward into the next tick
+        """
+        return system_address in mission_system_addresses or \
+                self.bgstally.state.current_system_id == system_address or \
+                sum(d['scooped'] for d in system['TWSandR'].values()) > 0
 
 
     #
@@ -292,21 +471,16 @@ class Activity:
         # Protect against rare case of null data, not able to trace how this can happen
         if journal_entry.get('SystemAddress') == None or journal_entry.get('StarSystem') == None: return
 
-        self.dirty = True
-        current_system = None
-
-        for system_address in self.systems:
-            if system_address == str(journal_entry['SystemAddress']):
-                # We already have an entry for this system
-                current_system = self.systems[system_address]
-                break
+        system_address:str = str(journal_entry['SystemAddress'])
+        current_system:dict|None = self.systems.get(system_address)
 
         if current_system is None:
             # We don't have this system yet
-            current_system = self._get_new_system_data(journal_entry['StarSystem'], journal_entry['SystemAddress'], {})
-            self.systems[str(journal_entry['SystemAddress'])] = current_system
+            current_system = self._get_new_system_data(journal_entry['StarSystem'], system_address, {})
+            self._add_system(system_address, current_system)
 
         self._update_system_data(current_system)
+        self.system_changed(current_system)
 
         if 'Factions' in journal_entry:
             for faction in journal_entry['Factions']:
@@ -336,8 +510,9 @@ class Activity:
                     current_system['Factions'][faction_2]['FactionState'] = conflict_state
                     current_system['Factions'][faction_2]['Opponent'] = faction_1
 
-        self.recalculate_zero_activity()
-        state.current_system_id = str(current_system['SystemAddress'])
+        self._update_zero_activity()
+        state.current_system_id = system_address
+        state.dirty = True
         current_system['tw_status'] = journal_entry.get('ThargoidWar', None)
 
 
@@ -345,8 +520,8 @@ class Activity:
         """
         Handle mission completed
         """
-        self.dirty = True
         mission:dict = mission_log.get_mission(journal_entry['MissionID'])
+        mission_category:MissionCategory = MISSION_CATEGORIES.get(journal_entry['Name'], MissionCategory.NONE)
 
         # BGS
         for faction_effect in journal_entry['FactionEffects']:
@@ -359,11 +534,12 @@ class Activity:
             if faction_effect['Influence'] != []:
                 inf_index: str = str(len(faction_effect['Influence'][0]['Influence'])) # Index into dict containing detailed INF breakdown
                 inftrend = faction_effect['Influence'][0]['Trend']
-                for system_address, system in self.systems.items():
-                    if str(faction_effect['Influence'][0]['SystemAddress']) != system_address: continue
+                system_address:str = str(faction_effect['Influence'][0]['SystemAddress'])
+                system:dict|None = self.systems.get(system_address)
+                faction:dict|None = system['Factions'].get(effect_faction_name) if system is not None else None
 
-                    faction = system['Factions'].get(effect_faction_name)
-                    if not faction: continue
+                if faction:
+                    self.system_changed(system)
 
                     if inftrend == "UpGood" or inftrend == "DownGood":
                         if effect_faction_name == journal_entry['Faction']:
@@ -379,98 +555,98 @@ class Activity:
                             faction['MissionPointsSecondary'][inf_index] -= 1
 
             elif mission is not None:  # No influence specified for faction effect
-                for system_address, system in self.systems.items():
-                    if mission['System'] != system['System']: continue
-
-                    faction = system['Factions'].get(effect_faction_name)
-                    if not faction: continue
+                system:dict|None = self.get_system_by_name(mission['System'])
+                faction:dict|None = system['Factions'].get(effect_faction_name) if system is not None else None
 
+                if faction:
                     if effect_faction_name == journal_entry['Faction']:
                         inf_index: str|None = None
 
-                        if faction['FactionState'] in STATES_ELECTION and journal_entry['Name'] in MISSIONS_ELECTION:
+                        if faction['FactionState'] in STATES_ELECTION and mission_category & MissionCategory.ELECTION:
                             inf_index = 1 # Default to +1 INF for election missions
-                        elif faction['FactionState'] in STATES_WAR and journal_entry['Name'] in MISSIONS_WAR:
+                        elif faction['FactionState'] in STATES_WAR and mission_category & MissionCategory.WAR:
                             inf_index = 2 # Default to +2 INF for war missions
 
                         if inf_index is not None:
                             faction['MissionPoints'][inf_index] += 1
-                            self.bgstally.ui.show_system_report(system_address) # Only show system report for primary INF
+                            self.system_changed(system)
+                            self.bgstally.ui.show_system_report(system['SystemAddress']) # Only show system report for primary INF
 
         # Thargoid War
-        if journal_entry['Name'] in MISSIONS_TW_COLLECT + MISSIONS_TW_EVAC_LOW + MISSIONS_TW_EVAC_MED + MISSIONS_TW_EVAC_HIGH + MISSIONS_TW_MASSACRE + MISSIONS_TW_REACTIVATE and mission is not None:
+        if mission_category & MissionCategory.TW and mission is not None:
             mission_station = mission.get('Station', "")
-            if mission_station != "":
-                for system_address, system in self.systems.items():
-                    if mission['System'] != system['System']: continue
-                    faction = system['Factions'].get(journal_entry['Faction'])
-                    if not faction: continue
-
-                    tw_stations = faction['TWStations']
-                    if mission_station not in tw_stations:
-                        tw_stations[mission_station] = self._get_new_tw_station_data(mission_station)
-
-                    if journal_entry['Name'] in MISSIONS_TW_REACTIVATE:
-                        self.bgstally.ui.show_system_report(system_address)
-
-                        # This tracking is unusual - we track BOTH against the station where the mission was completed AND the system where the settlement was reactivated
-                        tw_stations[mission_station]['reactivate'] += 1
-                        destination_system = self.get_system_by_name(mission['DestinationSystem'])
-                        if destination_system is not None:
-                            destination_system['TWReactivate'] += 1
-                    elif mission.get('PassengerCount', -1) > -1:
-                        self.bgstally.ui.show_system_report(system_address)
-
-                        if journal_entry['Name'] in MISSIONS_TW_EVAC_LOW:
-                            tw_stations[mission_station]['passengers']['l']['count'] += 1
-                            tw_stations[mission_station]['passengers']['l']['sum'] += mission.get('PassengerCount', -1)
-                        elif journal_entry['Name'] in MISSIONS_TW_EVAC_MED:
-                            tw_stations[mission_station]['passengers']['m']['count'] += 1
-                            tw_stations[mission_station]['passengers']['m']['sum'] += mission.get('PassengerCount', -1)
-                        elif journal_entry['Name'] in MISSIONS_TW_EVAC_HIGH:
-                            tw_stations[mission_station]['passengers']['h']['count'] += 1
-                            tw_stations[mission_station]['passengers']['h']['sum'] += mission.get('PassengerCount', -1)
-                    elif mission.get('CommodityCount', -1) > -1:
-                        self.bgstally.ui.show_system_report(system_address)
-
-                        match journal_entry.get('Commodity'):
-                            case "$OccupiedCryoPod_Name;":
-                                if journal_entry['Name'] in MISSIONS_TW_EVAC_LOW:
-                                    tw_stations[mission_station]['escapepods']['l']['count'] += 1
-                                    tw_stations[mission_station]['escapepods']['l']['sum'] += mission.get('CommodityCount', -1)
-                                elif journal_entry['Name'] in MISSIONS_TW_EVAC_MED:
-                                    tw_stations[mission_station]['escapepods']['m']['count'] += 1
-                                    tw_stations[mission_station]['escapepods']['m']['sum'] += mission.get('CommodityCount', -1)
-                                elif journal_entry['Name'] in MISSIONS_TW_EVAC_HIGH:
-                                    tw_stations[mission_station]['escapepods']['h']['count'] += 1
-                                    tw_stations[mission_station]['escapepods']['h']['sum'] += mission.get('CommodityCount', -1)
-                            case _:
-                                tw_stations[mission_station]['cargo']['count'] += 1
-                                tw_stations[mission_station]['cargo']['sum'] += mission.get('CommodityCount', -1)
-                    elif mission.get('KillCount', -1) > -1:
-                        self.bgstally.ui.show_system_report(system_address)
-
-                        match journal_entry.get('TargetType'):
-                            case "$MissionUtil_FactionTag_Scout;":
-                                tw_stations[mission_station]['massacre']['s']['count'] += 1
-                                tw_stations[mission_station]['massacre']['s']['sum'] += mission.get('KillCount', -1)
-                            case "$MissionUtil_FactionTag_Cyclops;":
-                                tw_stations[mission_station]['massacre']['c']['count'] += 1
-                                tw_stations[mission_station]['massacre']['c']['sum'] += mission.get('KillCount', -1)
-                            case "$MissionUtil_FactionTag_Basilisk;":
-                                tw_stations[mission_station]['massacre']['b']['count'] += 1
-                                tw_stations[mission_station]['massacre']['b']['sum'] += mission.get('KillCount', -1)
-                            case "$MissionUtil_FactionTag_Medusa;":
-                                tw_stations[mission_station]['massacre']['m']['count'] += 1
-                                tw_stations[mission_station]['massacre']['m']['sum'] += mission.get('KillCount', -1)
-                            case "$MissionUtil_FactionTag_Hydra;":
-                                tw_stations[mission_station]['massacre']['h']['count'] += 1
-                                tw_stations[mission_station]['massacre']['h']['sum'] += mission.get('KillCount', -1)
-                            case "$MissionUtil_FactionTag_Orthrus;":
-                                tw_stations[mission_station]['massacre']['o']['count'] += 1
-                                tw_stations[mission_station]['massacre']['o']['sum'] += mission.get('KillCount', -1)
-
-        self.recalculate_zero_activity()
+            system:dict|None = self.get_system_by_name(mission['System'])
+            faction:dict|None = system['Factions'].get(journal_entry['Faction']) if system is not None else None
+
+            if mission_station != "" and faction:
+                self.system_changed(system)
+
+                tw_stations = faction['TWStations']
+                if mission_station not in tw_stations:
+                    tw_stations[mission_station] = self._get_new_tw_station_data(mission_station)
+
+                if mission_category & MissionCategory.TW_REACTIVATE:
+                    self.bgstally.ui.show_system_report(system['SystemAddress'])
+
+                    # This tracking is unusual - we track BOTH against the station where the mission was completed AND the system where the settlement was reactivated
+                    tw_stations[mission_station]['reactivate'] += 1
+                    destination_system = self.get_system_by_name(mission['DestinationSystem'])
+                    if destination_system is not None:
+                        destination_system['TWReactivate'] += 1
+                        self.system_changed(destination_system)
+                elif mission.get('PassengerCount', -1) > -1:
+                    self.bgstally.ui.show_system_report(system['SystemAddress'])
+
+                    if mission_category & MissionCategory.TW_EVAC_LOW:
+                        tw_stations[mission_station]['passengers']['l']['count'] += 1
+                        tw_stations[mission_station]['passengers']['l']['sum'] += mission.get('PassengerCount', -1)
+                    elif mission_category & MissionCategory.TW_EVAC_MED:
+                        tw_stations[mission_station]['passengers']['m']['count'] += 1
+                        tw_stations[mission_station]['passengers']['m']['sum'] += mission.get('PassengerCount', -1)
+                    elif mission_category & MissionCategory.TW_EVAC_HIGH:
+                        tw_stations[mission_station]['passengers']['h']['count'] += 1
+                        tw_stations[mission_station]['passengers']['h']['sum'] += mission.get('PassengerCount', -1)
+                elif mission.get('CommodityCount', -1) > -1:
+                    self.bgstally.ui.show_system_report(system['SystemAddress'])
+
+                    match journal_entry.get('Commodity'):
+                        case "$OccupiedCryoPod_Name;":
+                            if mission_category & MissionCategory.TW_EVAC_LOW:
+                                tw_stations[mission_station]['escapepods']['l']['count'] += 1
+                                tw_stations[mission_station]['escapepods']['l']['sum'] += mission.get('CommodityCount', -1)
+                            elif mission_category & MissionCategory.TW_EVAC_MED:
+                                tw_stations[mission_station]['escapepods']['m']['count'] += 1
+                                tw_stations[mission_station]['escapepods']['m']['sum'] += mission.get('CommodityCount', -1)
+                            elif mission_category & MissionCategory.TW_EVAC_HIGH:
+                                tw_stations[mission_station]['escapepods']['h']['count'] += 1
+                                tw_stations[mission_station]['escapepods']['h']['sum'] += mission.get('CommodityCount', -1)
+                        case _:
+                            tw_stations[mission_station]['cargo']['count'] += 1
+                            tw_stations[mission_station]['cargo']['sum'] += mission.get('CommodityCount', -1)
+                elif mission.get('KillCount', -1) > -1:
+                    self.bgstally.ui.show_system_report(system['SystemAddress'])
+
+                    match journal_entry.get('TargetType'):
+                        case "$MissionUtil_FactionTag_Scout;":
+                            tw_stations[mission_station]['massacre']['s']['count'] += 1
+                            tw_stations[mission_station]['massacre']['s']['sum'] += mission.get('KillCount', -1)
+                        case "$MissionUtil_FactionTag_Cyclops;":
+                            tw_stations[mission_station]['massacre']['c']['count'] += 1
+                            tw_stations[mission_station]['massacre']['c']['sum'] += mission.get('KillCount', -1)
+                        case "$MissionUtil_FactionTag_Basilisk;":
+                            tw_stations[mission_station]['massacre']['b']['count'] += 1
+                            tw_stations[mission_station]['massacre']['b']['sum'] += mission.get('KillCount', -1)
+                        case "$MissionUtil_FactionTag_Medusa;":
+                            tw_stations[mission_station]['massacre']['m']['count'] += 1
+                            tw_stations[mission_station]['massacre']['m']['sum'] += mission.get('KillCount', -1)
+                        case "$MissionUtil_FactionTag_Hydra;":
+                            tw_stations[mission_station]['massacre']['h']['count'] += 1
+                            tw_stations[mission_station]['massacre']['h']['sum'] += mission.get('KillCount', -1)
+                        case "$MissionUtil_FactionTag_Orthrus;":
+                            tw_stations[mission_station]['massacre']['o']['count'] += 1
+                            tw_stations[mission_station]['massacre']['o']['sum'] += mission.get('KillCount', -1)
+
+        self._update_zero_activity()
         mission_log.delete_mission_by_id(journal_entry['MissionID'])
 
 
@@ -480,19 +656,19 @@ class Activity:
         """
         mission:dict = mission_log.get_mission(journal_entry['MissionID'])
         if mission is None: return
-        self.dirty = True
 
-        for system in self.systems.values():
-            if mission['System'] != system['System']: continue
+        system:dict|None = self.get_system_by_name(mission['System'])
+        if system is None: return
 
-            self.bgstally.ui.show_system_report(system['SystemAddress'])
+        self.bgstally.ui.show_system_report(system['SystemAddress'])
 
-            faction = system['Factions'].get(mission['Faction'])
-            if faction: faction['MissionFailed'] += 1
+        faction = system['Factions'].get(mission['Faction'])
+        if faction:
+            faction['MissionFailed'] += 1
+            self.system_changed(system)
 
-            mission_log.delete_mission_by_id(mission['MissionID'])
-            self.recalculate_zero_activity()
-            break
+        mission_log.delete_mission_by_id(mission['MissionID'])
+        self._update_zero_activity()
 
 
     def exploration_data_sold(self, journal_entry: Dict, state: State):
@@ -501,10 +677,10 @@ class Activity:
         """
         current_system = self.systems.get(state.current_system_id)
         if not current_system: return
-        self.dirty = True
 
         faction = current_system['Factions'].get(state.station_faction)
         if faction:
+            self.system_changed(current_system)
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
             base_value:int = journal_entry.get('BaseValue', 0)
@@ -513,7 +689,7 @@ class Activity:
             if total_earnings < base_value + bonus: total_earnings = base_value + bonus
 
             faction['CartData'] += total_earnings
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def organic_data_sold(self, journal_entry: Dict, state: State):
@@ -522,15 +698,15 @@ class Activity:
         """
         current_system = self.systems.get(state.current_system_id)
         if not current_system: return
-        self.dirty = True
 
         faction = current_system['Factions'].get(state.station_faction)
         if faction:
+            self.system_changed(current_system)
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
             for e in journal_entry['BioData']:
                 faction['ExoData'] += e['Value'] + e['Bonus']
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def bv_received(self, journal_entry: Dict, state: State):
@@ -558,18 +734,18 @@ class Activity:
         """
         current_system = self.systems.get(state.current_system_id)
         if not current_system: return
-        self.dirty = True
 
         for bv_info in journal_entry['Factions']:
             faction = current_system['Factions'].get(bv_info['Faction'])
             if faction:
+                self.system_changed(current_system)
                 self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
                 if state.station_type == 'FleetCarrier':
-                    faction['Bounties'] += (bv_info['Amount'] / 2)
+                    faction['Bounties'] += bv_info['Amount'] // 2
                 else:
                     faction['Bounties'] += bv_info['Amount']
-                self.recalculate_zero_activity()
+                self._update_zero_activity()
 
 
     def cb_received(self, journal_entry: dict, state: State):
@@ -613,14 +789,14 @@ class Activity:
         """
         current_system = self.systems.get(state.current_system_id)
         if not current_system: return
-        self.dirty = True
 
         faction = current_system['Factions'].get(journal_entry['Faction'])
         if faction:
+            self.system_changed(current_system)
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
             faction['CombatBonds'] += journal_entry['Amount']
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def cap_ship_bond_received(self, journal_entry: dict):
@@ -636,12 +812,12 @@ class Activity:
             faction = current_system['Factions'].get(journal_entry.get('AwardingFaction', ""))
             if not faction: return
 
-            self.dirty = True
+            self.system_changed(current_system)
 
-            faction['SpaceCZ']['cs'] = int(faction['SpaceCZ'].get('cs', '0')) + 1
+            faction['SpaceCZ']['cs'] = faction['SpaceCZ'].get('cs', 0) + 1
 
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def trade_purchased(self, journal_entry:dict, state:State):
@@ -653,7 +829,7 @@ class Activity:
 
         faction = current_system['Factions'].get(state.station_faction)
         if faction:
-            self.dirty = True
+            self.system_changed(current_system)
             bracket:int = 0
 
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
@@ -665,7 +841,7 @@ class Activity:
             faction['TradeBuy'][bracket]['value'] += journal_entry['TotalCost']
             faction['TradeBuy'][bracket]['items'] += journal_entry['Count']
 
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def trade_sold(self, journal_entry:dict, state:State):
@@ -683,7 +859,7 @@ class Activity:
 
         faction = current_system['Factions'].get(state.station_faction)
         if faction:
-            self.dirty = True
+            self.system_changed(current_system)
             cost:int = journal_entry['Count'] * journal_entry['AvgPricePaid']
             profit:int = journal_entry['TotalSale'] - cost
             bracket:int = 0
@@ -701,7 +877,7 @@ class Activity:
                 faction['TradeSell'][bracket]['value'] += journal_entry['TotalSale']
                 faction['TradeSell'][bracket]['items'] += journal_entry['Count']
 
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
 
     def ship_targeted(self, journal_entry: Dict, state: State):
@@ -715,7 +891,6 @@ class Activity:
 
         if 'Faction' in journal_entry and 'PilotName_Localised' in journal_entry and 'PilotName' in journal_entry:
             # Store info on targeted ship
-            self.dirty = True
             state.last_ship_targeted = {'Faction': journal_entry['Faction'],
                                         'PilotName': journal_entry['PilotName'],
                                         'PilotName_Localised': journal_entry['PilotName_Localised']}
@@ -733,7 +908,6 @@ class Activity:
         """
         current_system = self.systems.get(state.current_system_id)
         if not current_system: return
-        self.dirty = True
 
         # For in-space murders, the faction logged in the CommitCrime event is the system faction,
         # not the ship faction. We need to log the murder against the ship faction, so we store
@@ -750,7 +924,8 @@ class Activity:
 
                 if faction:
                     faction['Murdered'] += 1
-                    self.recalculate_zero_activity()
+                    self.system_changed(current_system)
+                    self._update_zero_activity()
 
                     self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
@@ -759,7 +934,8 @@ class Activity:
                 faction = current_system['Factions'].get(journal_entry['Faction'])
                 if faction:
                     faction['GroundMurdered'] += 1
-                    self.recalculate_zero_activity()
+                    self.system_changed(current_system)
+                    self._update_zero_activity()
 
                     self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
@@ -792,7 +968,7 @@ class Activity:
         if key is None: return
 
         current_system['TWSandR'][key]['scooped'] += 1
-        self.dirty = True
+        self.system_changed(current_system)
 
 
     def cargo_ejected(self, journal_entry: dict):
@@ -844,11 +1020,11 @@ class Activity:
 
         faction = current_system['Factions'].get(state.station_faction)
         if faction:
-            self.dirty = True
+            self.system_changed(current_system)
             self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
             faction['SandR'][key] += count
-            self.recalculate_zero_activity()
+            self._update_zero_activity()
 
         # Handle TW S&R
         if not tw: return
@@ -910,26 +1086,39 @@ class Activity:
 
     def recalculate_zero_activity(self):
         """
-        For efficiency at display time, we store whether each system has had any activity in the data structure
+        For efficiency at display time, we store whether each system has had any activity in the data structure. This
+        checks every system, so is only needed when loading. As activity happens, only changed systems are re-checked.
         """
         for system in self.systems.values():
             self._update_system_data(system)
-            system['zero_system_activity'] = True
-
             for faction_data in system['Factions'].values():
                 self._update_faction_data(faction_data)
-                if not self._is_faction_data_zero(faction_data):
-                    system['zero_system_activity'] = False
+            self._update_counter_types(system)
 
-            if system['zero_system_activity'] == False: continue
+            self.recalculate_system_zero_activity(system)
 
-            if sum(system['TWKills'].values()) > 0: system['zero_system_activity'] = False
+        self.zero_activity_pending.clear()
 
-            if system['zero_system_activity'] == False: continue
 
-            if sum(int(d['delivered']) for d in system['TWSandR'].values()) > 0: system['zero_system_activity'] = False
+    def recalculate_system_zero_activity(self, system: dict):
+        """
+        Update the stored zero activity flag for a single system
+        """
+        self._update_system_data(system)
+        system['zero_system_activity'] = True
+
+        for faction_data in system['Factions'].values():
+            self._update_faction_data(faction_data)
+            if not self._is_faction_data_zero(faction_data):
+                system['zero_system_activity'] = False
+                return
+
+        if sum(system['TWKills'].values()) > 0:
+            system['zero_system_activity'] = False
+            return
 
-            if system['zero_system_activity'] == False: continue
+        if sum(d['delivered'] for d in system['TWSandR'].values()) > 0:
+            system['zero_system_activity'] = False
 
 
     #
@@ -941,7 +1130,9 @@ class Activity:
         We are logging a Thargoid kill
         """
         tw_ship:str = TW_CBS.get(journal_entry.get('Reward', 0))
-        if tw_ship: current_system['TWKills'][tw_ship] = current_system['TWKills'].get(tw_ship, 0) + 1
+        if tw_ship:
+            current_system['TWKills'][tw_ship] = current_system['TWKills'].get(tw_ship, 0) + 1
+            self.system_changed(current_system)
 
         self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
@@ -953,7 +1144,7 @@ class Activity:
         faction = current_system['Factions'].get(journal_entry['AwardingFaction'])
         if not faction: return
 
-        self.dirty = True
+        self.system_changed(current_system)
 
         self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
@@ -975,7 +1166,7 @@ class Activity:
             # Handle as 'Low' if this is the first CB
             if state.last_settlement_approached['size'] == None:
                 # Increment overall 'Low' count for this faction
-                faction['GroundCZ']['l'] = int(faction['GroundCZ'].get('l', '0')) + 1
+                faction['GroundCZ']['l'] = faction['GroundCZ'].get('l', 0) + 1
                 # Set faction settlement type
                 faction['GroundCZSettlements'][state.last_settlement_approached['name']]['type'] = 'l'
                 # Store last settlement type
@@ -984,9 +1175,9 @@ class Activity:
             # Handle as 'Med' if this is either the first CB or we've counted this settlement as a 'Low' before
             if state.last_settlement_approached['size'] == None or state.last_settlement_approached['size'] == 'l':
                 # Increment overall 'Med' count for this faction
-                faction['GroundCZ']['m'] = int(faction['GroundCZ'].get('m', '0')) + 1
+                faction['GroundCZ']['m'] = faction['GroundCZ'].get('m', 0) + 1
                 # Decrement overall previous size count if we previously counted it
-                if previous_size != None: faction['GroundCZ'][previous_size] = int(faction['GroundCZ'].get(previous_size, '0')) - 1
+                if previous_size != None: faction['GroundCZ'][previous_size] = faction['GroundCZ'].get(previous_size, 0) - 1
                 # Set faction settlement type
                 faction['GroundCZSettlements'][state.last_settlement_approached['name']]['type'] = 'm'
                 # Store last settlement type
@@ -995,15 +1186,15 @@ class Activity:
             # Handle as 'High' if this is either the first CB or we've counted this settlement as a 'Low' or 'Med' before
             if state.last_settlement_approached['size'] == None or state.last_settlement_approached['size'] == 'l' or state.last_settlement_approached['size'] == 'm':
                 # Increment overall 'High' count for this faction
-                faction['GroundCZ']['h'] = int(faction['GroundCZ'].get('h', '0')) + 1
+                faction['GroundCZ']['h'] = faction['GroundCZ'].get('h', 0) + 1
                 # Decrement overall previous size count if we previously counted it
-                if previous_size != None: faction['GroundCZ'][previous_size] = int(faction['GroundCZ'].get(previous_size, '0')) - 1
+                if previous_size != None: faction['GroundCZ'][previous_size] = faction['GroundCZ'].get(previous_size, 0) - 1
                 # Set faction settlement type
                 faction['GroundCZSettlements'][state.last_settlement_approached['name']]['type'] = 'h'
                 # Store last settlement type
                 state.last_settlement_approached['size'] = 'h'
 
-        self.recalculate_zero_activity()
+        self._update_zero_activity()
 
 
     def _cb_space_cz(self, journal_entry:dict, current_system:dict, state:State):
@@ -1023,19 +1214,22 @@ class Activity:
             if state.last_ship_targeted.get('PilotName', "") in SPACECZ_PILOTNAMES_CAPTAIN and not state.last_spacecz_approached.get('capt'):
                 # Tally a captain kill. Unreliable because of journal order unpredictability.
                 state.last_spacecz_approached['capt'] = True
-                faction['SpaceCZ']['cp'] = int(faction['SpaceCZ'].get('cp', '0')) + 1
+                faction['SpaceCZ']['cp'] = faction['SpaceCZ'].get('cp', 0) + 1
+                self.system_changed(current_system)
                 self.bgstally.ui.show_system_report(current_system['SystemAddress'])
             elif state.last_ship_targeted.get('PilotName', "") in SPACECZ_PILOTNAMES_SPECOPS and not state.last_spacecz_approached.get('specops'):
                 # Tally a specops kill. We would like to only tally this after 4 kills in a CZ, but sadly due to journal order
                 # unpredictability we tally as soon as we spot a kill after targeting a spec ops
                 state.last_spacecz_approached['specops'] = True
-                faction['SpaceCZ']['so'] = int(faction['SpaceCZ'].get('so', '0')) + 1
+                faction['SpaceCZ']['so'] = faction['SpaceCZ'].get('so', 0) + 1
+                self.system_changed(current_system)
                 self.bgstally.ui.show_system_report(current_system['SystemAddress'])
             elif state.last_ship_targeted.get('PilotName', "") == SPACECZ_PILOTNAME_PROPAGAND and not state.last_spacecz_approached.get('propagand'):
                 # Tally a propagandist kill. We would like to only tally this after 3 kills in a CZ, but sadly due to journal order
                 # unpredictability we tally as soon as we spot a kill after targeting a propagandist
                 state.last_spacecz_approached['propagand'] = True
-                faction['SpaceCZ']['pr'] = int(faction['SpaceCZ'].get('pr', '0')) + 1
+                faction['SpaceCZ']['pr'] = faction['SpaceCZ'].get('pr', 0) + 1
+                self.system_changed(current_system)
                 self.bgstally.ui.show_system_report(current_system['SystemAddress'])
 
         # If we've already counted this CZ, exit
@@ -1043,13 +1237,13 @@ class Activity:
 
         state.last_spacecz_approached['counted'] = True
         state.last_spacecz_approached['ally_faction'] = faction.get('Faction', "")
-        self.dirty = True
+        self.system_changed(current_system)
 
         type:str = state.last_spacecz_approached.get('type', 'l')
-        faction['SpaceCZ'][type] = int(faction['SpaceCZ'].get(type, '0')) + 1
+        faction['SpaceCZ'][type] = faction['SpaceCZ'].get(type, 0) + 1
 
         self.bgstally.ui.show_system_report(current_system['SystemAddress'])
-        self.recalculate_zero_activity()
+        self._update_zero_activity()
 
 
     def _bv_megaship_scenario(self, journal_entry:dict, current_system:dict, state:State):
@@ -1065,13 +1259,13 @@ class Activity:
         if state.last_megaship_approached.get('counted', False): return
 
         state.last_megaship_approached['counted'] = True
-        self.dirty = True
+        self.system_changed(current_system)
 
         # The scenario should be counted against the opponent faction of the ship just killed
         opponent_faction['Scenarios'] += 1
 
         self.bgstally.ui.show_system_report(current_system['SystemAddress'])
-        self.recalculate_zero_activity()
+        self._update_zero_activity()
 
 
     def _tw_sandr_handin(self, key:str, count:int, tally:bool):
@@ -1091,7 +1285,7 @@ class Activity:
                 system['TWSandR'][key]['scooped'] -= allocatable
                 if tally: system['TWSandR'][key]['delivered'] += allocatable
                 count -= allocatable
-                self.dirty = True
+                self.system_changed(system)
 
                 if tally: self.bgstally.ui.show_system_report(system['SystemAddress'])
 
@@ -1099,18 +1293,159 @@ class Activity:
         # where it originally came from
 
 
+    def _add_system(self, system_address:str, system:dict):
+        """
+        Add a new system, keeping the system name index up to date
+        """
+        self.systems[system_address] = system
+        if self._system_names is not None: self._system_names.setdefault(system['System'], system_address)
+
+
+    def _get_system_address(self, system_name:str) -> str|None:
+        """
+        Return the address of a system from its name, or None if we have no system with that name. The name index is built
+        on first use, and thrown away whenever systems are removed or the systems data is replaced.
+        """
+        if self._system_names is None:
+            # Fetch systems first, as this may trigger a lazy load which resets the index
+            systems:dict = self.systems
+            self._system_names = {}
+            for system_address, system in systems.items():
+                # Keep the first system if there are duplicate names, as we always have done
+                self._system_names.setdefault(system['System'], system_address)
+
+        return self._system_names.get(system_name)
+
+
+    def _get_system_addresses(self, system_names:list) -> set:
+        """
+        Return the set of addresses for a list of system names, ignoring any systems we don't have
+        """
+        system_addresses:set = set()
+        for system_name in system_names:
+            system_address:str|None = self._get_system_address(system_name)
+            if system_address is not None: system_addresses.add(system_address)
+
+        return system_addresses
+
+
+    def system_changed(self, system:dict):
+        """
+        Flag a system as changed, so it is written to the change log on next save and its zero activity flag is updated
+        """
+        self.dirty_systems.add(system['SystemAddress'])
+        self.zero_activity_pending.add(system['SystemAddress'])
+
+
+    def _update_zero_activity(self):
+        """
+        Update the zero activity flag for all systems changed since we last did this
+        """
+        for system_address in self.zero_activity_pending:
+            system:dict|None = self.systems.get(system_address)
+            if system is not None: self.recalculate_system_zero_activity(system)
+
+        self.zero_activity_pending.clear()
+
+
+    def _get_log_filepath(self, filepath:str) -> str:
+        """
+        Return the change log file path for an activity file path
+        """
+        return path.splitext(filepath)[0] + FILE_SUFFIX_LOG
+
+
+    def _load_header(self, filepath:str) -> bool:
+        """
+        Load just the header data from an activity file, without parsing the systems data that follows it. Returns
+        False if the header could not be read, in which case the whole file should be loaded instead.
+        """
+        try:
+            with open(filepath, encoding='utf-8') as activityfile:
+                header:str = ""
+                while True:
+                    chunk:str = activityfile.read(ACTIVITY_HEADER_CHUNK_SIZE)
+                    if not chunk: return False
+
+                    # Start searching a little before the new chunk in case the key straddles two chunks
+                    match:re.Match = RE_ACTIVITY_SYSTEMS_KEY.search(header + chunk, max(0, len(header) - 32))
+                    header += chunk
+                    if match: break
+
+            self._from_dict(json.loads(header[:match.start()] + "}"))
+            return True
+        except Exception:
+            return False
+
+
+    def _load_lazy_data(self):
+        """
+        Load all data for a lazily loaded Activity
+        """
+        filepath:str = self.lazy_filepath
+        self.lazy_filepath = None
+
+        if path.exists(filepath):
+            try:
+                with open(filepath) as activityfile:
+                    self._from_dict(json.load(activityfile))
+            except Exception as e:
+                Debug.logger.warning(f"Unable to load {filepath}", exc_info=e)
+        else:
+            # Only the change log was written, take a full snapshot on next save so the activity file is written
+            self.dirty = True
+
+        self._replay_log(self._get_log_filepath(filepath), not path.exists(filepath))
+        self.recalculate_zero_activity()
+
+
+    def _replay_log(self, log_filepath:str, log_only:bool = False):
+        """
+        Apply all records from a change log that belong to our current snapshot generation. Each record contains the
+        complete data for the systems that changed, so later records simply overwrite earlier ones. If log_only is True
+        there is no activity file to give the generation, so the generation of the first record is used.
+        """
+        if not path.exists(log_filepath): return
+
+        try:
+            with open(log_filepath, encoding='utf-8') as logfile:
+                for line in logfile:
+                    try:
+                        record:dict = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A partially written final record, from a crash during an append. Take a fresh snapshot on next
+                        # save so we don't append after it.
+                        Debug.logger.warning(f"Ignoring incomplete record in {log_filepath}")
+                        self.dirty = True
+                        break
+
+                    if log_only:
+                        self.log_generation = record.get('gen', 0)
+                        log_only = False
+
+                    # Records from an older generation were written before a snapshot that already contains them
+                    if record.get('gen') != self.log_generation: continue
+
+                    self.systems.update(record.get('systems', {}))
+                    self._system_names = None
+                    self.log_records += 1
+        except Exception as e:
+            Debug.logger.warning(f"Unable to replay {log_filepath}", exc_info=e)
+
+
     def _tw_sandr_clear_all_scooped(self):
         """
         Clear down all TW search and rescue scooped cargo
         """
         for system in self.systems.values():
+            if sum(d['scooped'] for d in system['TWSandR'].values()) == 0: continue
+
             system['TWSandR']['dp']['scooped'] = 0
             system['TWSandR']['op']['scooped'] = 0
             system['TWSandR']['tp']['scooped'] = 0
             system['TWSandR']['bb']['scooped'] = 0
             system['TWSandR']['t']['scooped'] = 0
-
-        self.dirty = True
+            self.system_changed(system)
 
 
     def get_sample_system_data(self) -> dict:
@@ -1120,7 +1455,7 @@ class Activity:
             dict: The sample system data
         """
         return {'System': "Sample System Name",
-                'SystemAddress': 1,
+                'SystemAddress': "Sample System ID",
                 'zero_system_activity': False,
                 'Factions': {"Sample Faction Name 1": self._get_new_faction_data("Sample Faction Name 1", "None", True),
                              "Sample Faction Name 2": self._get_new_faction_data("Sample Faction Name 2", "None", True),
@@ -1312,30 +1647,55 @@ class Activity:
         if not 'SandR' in faction_data: faction_data['SandR'] = {'dp': 0, 'op': 0, 'tp': 0, 'bb': 0, 'wc': 0, 'pe': 0, 'pp': 0, 'h': 0}
 
 
+    def _update_counter_types(self, system_data: dict):
+        """
+        Older data can contain counters stored as strings (including ""). Convert all counters to int so they can be used
+        directly everywhere without converting.
+        """
+        def to_int(value) -> int:
+            return value if isinstance(value, int) else int(value or 0)
+
+        for key in system_data['TWKills']: system_data['TWKills'][key] = to_int(system_data['TWKills'][key])
+        for d in system_data['TWSandR'].values():
+            d['scooped'] = to_int(d['scooped'])
+            d['delivered'] = to_int(d['delivered'])
+        system_data['TWReactivate'] = to_int(system_data['TWReactivate'])
+
+        for faction_data in system_data['Factions'].values():
+            for counter in FACTION_INT_COUNTERS:
+                faction_data[counter] = to_int(faction_data[counter])
+            for counter in FACTION_DICT_COUNTERS:
+                counter_data:dict = faction_data[counter]
+                for key in counter_data: counter_data[key] = to_int(counter_data[key])
+            for trade in faction_data['TradeBuy'] + faction_data['TradeSell']:
+                for key in trade: trade[key] = to_int(trade[key])
+
+
     def _is_faction_data_zero(self, faction_data: Dict):
         """
         Check whether all information is empty or zero for a faction. _update_faction_data() is always called before this
-        so we can always assume here that the data is in the very latest structure.
-        """
-        return sum((1 if k == 'm' else int(k)) * int(v) for k, v in faction_data['MissionPoints'].items()) == 0 and \
-                sum((1 if k == 'm' else int(k)) * int(v) for k, v in faction_data['MissionPointsSecondary'].items()) == 0 and \
-                int(faction_data['BlackMarketProfit']) == 0 and \
-                sum(int(d['value']) for d in faction_data['TradeBuy']) == 0 and \
-                sum(int(d['value']) for d in faction_data['TradeSell']) == 0 and \
-                int(faction_data['BlackMarketProfit']) == 0 and \
-                int(faction_data['Bounties']) == 0 and int(faction_data['CartData']) == 0 and int(faction_data['ExoData']) == 0 and \
-                int(faction_data['CombatBonds']) == 0 and int(faction_data['MissionFailed']) == 0 and int(faction_data['Murdered']) == 0 and int(faction_data['GroundMurdered']) == 0 and \
+        so we can always assume here that the data is in the very latest structure, and _update_counter_types() has been
+        called on load so all counters are int.
+        """
+        return sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in faction_data['MissionPoints'].items()) == 0 and \
+                sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in faction_data['MissionPointsSecondary'].items()) == 0 and \
+                faction_data['BlackMarketProfit'] == 0 and \
+                sum(d['value'] for d in faction_data['TradeBuy']) == 0 and \
+                sum(d['value'] for d in faction_data['TradeSell']) == 0 and \
+                faction_data['Bounties'] == 0 and faction_data['CartData'] == 0 and faction_data['ExoData'] == 0 and \
+                faction_data['CombatBonds'] == 0 and faction_data['MissionFailed'] == 0 and faction_data['Murdered'] == 0 and faction_data['GroundMurdered'] == 0 and \
                 sum(faction_data.get('SpaceCZ', {}).values()) == 0 and \
-                (faction_data['GroundCZ'] == {} or (int(faction_data['GroundCZ'].get('l', 0)) == 0 and int(faction_data['GroundCZ'].get('m', 0)) == 0 and int(faction_data['GroundCZ'].get('h', 0)) == 0)) and \
+                (faction_data['GroundCZ'] == {} or (faction_data['GroundCZ'].get('l', 0) == 0 and faction_data['GroundCZ'].get('m', 0) == 0 and faction_data['GroundCZ'].get('h', 0) == 0)) and \
                 faction_data['GroundCZSettlements'] == {} and \
-                int(faction_data['Scenarios']) == 0 and \
+                faction_data['Scenarios'] == 0 and \
                 sum(faction_data.get('SandR', {}).values()) == 0 and \
                 faction_data['TWStations'] == {}
 
 
     def _as_dict(self):
         """
-        Return a Dictionary representation of our data, suitable for serializing
+        Return a Dictionary representation of our data, suitable for serializing. 'systems' must remain the last
+        entry, as lazy loading reads the header data up to it.
         """
         return {
             'tickid': self.tick_id,
@@ -1343,6 +1703,7 @@ class Activity:
             'tickforced': self.tick_forced,
             'discordwebhookdata': self.discord_webhook_data,
             'discordnotes': self.discord_notes,
+            'loggeneration': self.log_generation,
             'systems': self.systems}
 
 
@@ -1355,8 +1716,13 @@ class Activity:
         self.tick_forced = dict.get('tickforced', False)
         self.discord_webhook_data = dict.get('discordwebhookdata', {})
         self.discord_notes = dict.get('discordnotes', "")
+        self.log_generation = dict.get('loggeneration', 0)
         self.systems = dict.get('systems', {})
 
+        # Systems created before SystemAddress was normalised may have an int address
+        for system in self.systems.values():
+            system['SystemAddress'] = str(system['SystemAddress'])
+
 
 
     # Comparator functions - we use the tick_time for sorting
@@ -1383,25 +1749,3 @@ class Activity:
 
     def __repr__(self):
         return f"{self.tick_id} ({self.tick_time}): {self._as_dict()}"
-
-
-    # Deep copy override function - we don't deep copy any class references, just data
-
-    def __deepcopy__(self, memo):
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-
-        # Copied items
-        setattr(result, 'bgstally', self.bgstally)
-        setattr(result, 'tick_id', self.tick_id)
-        setattr(result, 'tick_time', self.tick_time)
-        setattr(result, 'tick_forced', self.tick_forced)
-        setattr(result, 'discord_notes', self.discord_notes)
-        setattr(result, 'megaship_pat', self.megaship_pat)
-
-        # Deep copied items
-        setattr(result, 'systems', deepcopy(self.systems, memo))
-        setattr(result, 'discord_webhook_data', deepcopy(self.discord_webhook_data, memo))
-
-        return result
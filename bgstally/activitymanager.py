@@ -1,17 +1,19 @@
-from copy import deepcopy
+import json
 from os import listdir, mkdir, path, remove, rename
 
 from config import config
 
 from bgstally.activity import Activity
-from bgstally.constants import FILE_SUFFIX
+from bgstally.constants import FILE_SUFFIX, FILE_SUFFIX_LOG
 from bgstally.debug import Debug
 from bgstally.tick import Tick
+from bgstally.savemanager import FileWrite
 
 FILE_LEGACY_CURRENTDATA = "Today Data.txt"
 FILE_LEGACY_PREVIOUSDATA = "Yesterday Data.txt"
 FOLDER_ACTIVITYDATA = "activitydata"
 FOLDER_ACTIVITYDATA_ARCHIVE = "archive"
+FILE_ACTIVITY_INDEX = "tickindex.json"
 KEEP_CURRENT_ACTIVITIES = 20
 
 
@@ -27,6 +29,10 @@ class ActivityManager:
         self.activity_data: list[Activity] = []
         self.current_activity: Activity|None = None
 
+        # Index of stored activity files. key = tick_id, value = dict containing tick time, forced flag, file size and system count
+        self.index: dict = {}
+        self.index_dirty: bool = False
+
         self._load()
         self._archive_old_activity()
 
@@ -37,13 +43,24 @@ class ActivityManager:
             self.activity_data.sort(reverse=True)
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save all activity data
+        Prepare all changed activity data to be saved
         """
+        writes:list[FileWrite] = []
+
         for activity in self.activity_data:
             if activity.tick_id is None: continue
-            activity.save(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename()))
+            filepath:str = path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename())
+            activity_writes:list[FileWrite] = activity.prepare_save(filepath)
+            if activity_writes:
+                writes.extend(activity_writes)
+                self.index[activity.tick_id] = activity.get_index_entry(filepath)
+                self.index_dirty = True
+
+        # The index is written last, so it never refers to activity that isn't on disk yet
+        writes.extend(self._prepare_save_index())
+        return writes
 
 
     def get_current_activity(self) -> Activity|None:
@@ -62,7 +79,7 @@ class ActivityManager:
 
     def new_tick(self, tick: Tick, forced: bool) -> bool:
         """
-        New tick detected, duplicate the current Activity object or ignore if it's older than current tick.
+        New tick detected, create a new Activity object carried forward from the current one, or ignore if it's older than current tick.
         """
 
         if tick.tick_time < self.current_activity.tick_time:
@@ -70,17 +87,16 @@ class ActivityManager:
             # but an elitebgs.app tick was then detected with an earlier timestamp. Ignore the tick in this situation.
             return False
         else:
-            # An inbound tick is newer than the current tick. Create a new Activity object.
-            # Note Activity uses a customised __deepcopy__ that only deep copies data, not class instances.
-            new_activity:Activity = deepcopy(self.current_activity)
-            new_activity.tick_id = tick.tick_id
-            new_activity.tick_time = tick.tick_time
+            # An inbound tick is newer than the current tick. Create a new Activity object, carrying forward only the
+            # systems we still need from the current tick.
+            new_activity:Activity = Activity(self.bgstally, tick)
             new_activity.tick_forced = forced
-            new_activity.discord_webhook_data = {}
-            new_activity.discord_notes = ""
-            new_activity.clear_activity(self.bgstally.mission_log)
+            new_activity.carry_forward(self.current_activity, self.bgstally.mission_log)
             self.activity_data.append(new_activity)
             self.activity_data.sort(reverse=True)
+
+            # The previous tick will no longer change much, so fold its change log into a full snapshot on next save
+            self.current_activity.dirty = True
             self.current_activity = new_activity
 
             return True
@@ -94,12 +110,32 @@ class ActivityManager:
         filepath = path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA)
         if not path.exists(filepath): mkdir(filepath)
 
-        for activityfilename in listdir(filepath):
-            if activityfilename.endswith(FILE_SUFFIX):
+        if self._load_index():
+            # All activity is created from the index, and only loaded from disk when it's needed
+            for tick_id, index_entry in list(self.index.items()):
+                activityfilepath:str = path.join(filepath, tick_id + FILE_SUFFIX)
+                if not path.exists(activityfilepath) and not path.exists(path.join(filepath, tick_id + FILE_SUFFIX_LOG)):
+                    # The activity file has been manually deleted. A change log on its own is enough to rebuild the activity.
+                    del self.index[tick_id]
+                    self.index_dirty = True
+                    continue
+
                 activity = Activity(self.bgstally, Tick(self.bgstally))
-                activity.load(path.join(filepath, activityfilename))
+                activity.load_from_index(activityfilepath, tick_id, index_entry)
                 self.activity_data.append(activity)
                 if activity.tick_id == self.bgstally.tick.tick_id: self.current_activity = activity
+        else:
+            # No index, build it from the activity files
+            for activityfilename in listdir(filepath):
+                if activityfilename.endswith(FILE_SUFFIX) and activityfilename != FILE_ACTIVITY_INDEX:
+                    self._load_activity_file(path.join(filepath, activityfilename))
+
+        # The current tick's file or change log may have been written just before a crash that prevented the index being
+        # saved, or there may only be a change log if the activity file was never written
+        activityfilepath:str = path.join(filepath, self.bgstally.tick.tick_id + FILE_SUFFIX)
+        if self.current_activity is None \
+                and (path.exists(activityfilepath) or path.exists(path.join(filepath, self.bgstally.tick.tick_id + FILE_SUFFIX_LOG))):
+            self._load_activity_file(activityfilepath, self.bgstally.tick)
 
         # Handle legacy data if it exists - parse and migrate to new format
         filepath = path.join(self.bgstally.plugin_dir, FILE_LEGACY_PREVIOUSDATA)
@@ -123,7 +159,10 @@ class ActivityManager:
 
         activity = Activity(self.bgstally, tick)
         activity.load_legacy_data(filepath)
-        activity.save(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename()))
+        activityfilepath:str = path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename())
+        for write in activity.prepare_save(activityfilepath): write.write()
+        self.index[activity.tick_id] = activity.get_index_entry(activityfilepath)
+        self.index_dirty = True
         self.activity_data.append(activity)
         if activity.tick_id == tick.tick_id: self.current_activity = activity
 
@@ -142,11 +181,67 @@ class ActivityManager:
         for activity in activity_to_archive:
             try:
                 Debug.logger.info(f"Archiving {activity.get_filename()}")
-                rename(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename()),
-                       path.join(self.bgstally.plugin_dir, archive_filepath, activity.get_filename()))
+                # There may only be a change log, if the activity file was never written
+                if path.exists(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename())) \
+                        or not path.exists(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_log_filename())):
+                    rename(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_filename()),
+                           path.join(self.bgstally.plugin_dir, archive_filepath, activity.get_filename()))
+                if path.exists(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_log_filename())):
+                    rename(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, activity.get_log_filename()),
+                           path.join(self.bgstally.plugin_dir, archive_filepath, activity.get_log_filename()))
+
+                # Only forget the activity once it has left the activity folder, so a failed archive is still indexed
+                if self.index.pop(activity.tick_id, None) is not None: self.index_dirty = True
             except FileExistsError: # Destination exists
                 Debug.logger.warning(f"Attempt to archive failed, destination file already exists")
                 continue
             except FileNotFoundError: # Source doesn't exist
                 Debug.logger.warning(f"Attempt to archive failed, source file doesn't exist")
                 continue
+
+        for write in self._prepare_save_index(): write.write()
+
+
+    def _load_activity_file(self, filepath: str, tick: Tick|None = None):
+        """
+        Load the header data from an activity file, and add it to our activity data and index. The tick is used for the
+        tick information if there is only a change log for the activity.
+        """
+        activity = Activity(self.bgstally, tick or Tick(self.bgstally))
+        activity.load(filepath, lazy=True)
+        if activity.tick_id is None: return
+
+        self.activity_data.append(activity)
+        if activity.tick_id == self.bgstally.tick.tick_id: self.current_activity = activity
+
+        self.index[activity.tick_id] = activity.get_index_entry(filepath)
+        self.index_dirty = True
+
+
+    def _load_index(self) -> bool:
+        """
+        Load the activity index. Returns False if there is no valid index.
+        """
+        filepath:str = path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, FILE_ACTIVITY_INDEX)
+        if not path.exists(filepath): return False
+
+        try:
+            with open(filepath) as indexfile:
+                self.index = json.load(indexfile)
+        except Exception as e:
+            Debug.logger.warning(f"Unable to load {filepath}, rebuilding index", exc_info=e)
+            self.index = {}
+            return False
+
+        return True
+
+
+    def _prepare_save_index(self) -> list[FileWrite]:
+        """
+        Prepare the activity index to be saved, if it has changed
+        """
+        if not self.index_dirty: return []
+
+        text:str = json.dumps(self.index)
+        self.index_dirty = False
+        return [FileWrite(path.join(self.bgstally.plugin_dir, FOLDER_ACTIVITYDATA, FILE_ACTIVITY_INDEX), text)]
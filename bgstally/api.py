@@ -1,6 +1,5 @@
 
 from json import JSONDecodeError
-from queue import Queue
 from re import match
 from threading import Thread
 from time import sleep
@@ -8,9 +7,10 @@ from time import sleep
 import semantic_version
 from requests import Response
 
-from bgstally.constants import RequestMethod
+from bgstally.apispool import APISpool
+from bgstally.constants import RequestMethod, RequestPriority
 from bgstally.debug import Debug
-from bgstally.requestmanager import BGSTallyRequest
+from bgstally.requestmanager import RETRY_STATUSES, BGSTallyRequest, RetryPolicy
 from bgstally.utils import get_by_path
 
 API_VERSION = "1.5.0"
@@ -32,6 +32,8 @@ HEADER_APIVERSION = "apiversion"
 TIME_ACTIVITIES_WORKER_PERIOD_S = 60
 TIME_EVENTS_WORKER_PERIOD_S = 5
 BATCH_EVENTS_MAX_SIZE = 10
+# Activity and events are only sent once, so try harder than usual to deliver them
+RETRY_POLICY_API = RetryPolicy(max_attempts=5, backoff_s=5)
 
 
 class API:
@@ -39,16 +41,23 @@ class API:
     Handles data for an API.
     """
 
-    def __init__(self, bgstally, data:list = None):
+    def __init__(self, bgstally, spool:APISpool, data:list = None):
         """
         Instantiate
         """
         self.bgstally = bgstally
+        # Activity and events waiting to be sent, shared by all APIs and kept on disk
+        self.spool:APISpool = spool
+
+        # True if our user or discovery state has changed and needs saving
+        self.dirty:bool = False
 
         # Populate API user and discovery settings
         if data is not None:
             self.from_dict(data)
         else:
+            self.dirty = True
+
             # Default user state
             self.url:str = ""
             self.key:str = ""
@@ -59,11 +68,9 @@ class API:
             # Default API discovery state. Overridden by response from /discovery endpoint if it exists
             self._revert_discovery_to_defaults()
 
-        # Used to store a single dict containing BGS activity when it's been updated.
-        self.activity:dict = None
-
-        # Events queue is used to batch up events API messages. All batched messages are sent when the worker works.
-        self.events_queue:Queue = Queue()
+        # True while activity or a batch of events is being sent. Only one of each is sent at a time, so they arrive in order.
+        self.activity_sending:bool = False
+        self.events_sending:bool = False
 
         self.activities_thread: Thread = Thread(target=self._activities_worker, name=f"BGSTally Activities API Worker ({self.url})")
         self.activities_thread.daemon = True
@@ -116,17 +123,19 @@ class API:
         self.events:dict = data['events']
 
 
-    def discover(self, callback:callable):
+    def discover(self, callback:callable, priority:RequestPriority = RequestPriority.NORMAL):
         """
         Call the discovery endpoint
         """
-        self.bgstally.request_manager.queue_request(self.url + ENDPOINT_DISCOVERY, RequestMethod.GET, headers=self._get_headers(), callback=callback)
+        self.bgstally.request_manager.queue_request(self.url + ENDPOINT_DISCOVERY, RequestMethod.GET, headers=self._get_headers(), callback=callback, priority=priority)
 
 
     def discovery_received(self, success:bool, response:Response, request:BGSTallyRequest):
         """
         Discovery API information received from the server
         """
+        self.dirty = True
+
         if not success:
             Debug.logger.info(f"Unable to discover API capabilities, falling back to defaults")
             self._revert_discovery_to_defaults()
@@ -161,34 +170,40 @@ class API:
 
     def send_activity(self, activity:dict):
         """
-        Activity data has been updated. Store it ready for the next send via the worker.
+        Activity data has been updated. Spool it ready for the next send via the worker.
         """
         if not self.user_approved \
                 or not self.activities_enabled \
                 or not ENDPOINT_ACTIVITIES in self.endpoints \
                 or not self.bgstally.request_manager.url_valid(self.url):
-            self.activity = None
+            self.spool.clear_activities(self.url)
             return
 
-        self.activity = activity
+        self.spool.put_activity(self.url, activity)
+
+
+    def wants_event(self, event_name:str) -> bool:
+        """
+        Return True if this API is set up to receive the given journal event. Events may still be filtered out by their content.
+        """
+        return self.user_approved and self.events_enabled and event_name in self.events
 
 
     def send_event(self, event:dict):
         """
-        Event has been received. Add it to the events queue.
+        Event has been received. Add it to the events spool.
         """
         if not self.user_approved \
                 or not self.events_enabled \
                 or not ENDPOINT_EVENTS in self.endpoints \
                 or not self.bgstally.request_manager.url_valid(self.url):
-            with self.events_queue.mutex:
-                self.events_queue.queue.clear()
+            self.spool.clear_events(self.url)
             return
 
         if event.get('event', '') not in self.events or self._is_filtered(event):
             return
 
-        self.events_queue.put(event)
+        self.spool.put_event(self.url, event)
 
 
     def _revert_discovery_to_defaults(self):
@@ -232,8 +247,8 @@ class API:
 
     def _activities_worker(self) -> None:
         """
-        Handle activities API. If there's updated activity, this worker triggers a call to the activities endpoint
-        on a regular time period.
+        Handle activities API. If there's spooled activity, this worker triggers a call to the activities endpoint
+        on a regular time period, sending the oldest activity.
         """
         Debug.logger.debug("Starting Activities API Worker...")
 
@@ -243,22 +258,25 @@ class API:
                     or not self.activities_enabled \
                     or not ENDPOINT_ACTIVITIES in self.endpoints \
                     or not self.bgstally.request_manager.url_valid(self.url):
-                self.activity = None
+                self.spool.clear_activities(self.url)
 
-            if self.activity is not None:
-                url:str = self.url + get_by_path(self.endpoints, [ENDPOINT_ACTIVITIES, 'path'], ENDPOINT_ACTIVITIES)
+            spooled_activity:tuple[str, dict]|None = None if self.activity_sending else self.spool.get_activity(self.url)
 
-                self.bgstally.request_manager.queue_request(url, RequestMethod.PUT, headers=self._get_headers(), payload=self.activity)
+            if spooled_activity is not None:
+                url:str = self.url + get_by_path(self.endpoints, [ENDPOINT_ACTIVITIES, 'path'], ENDPOINT_ACTIVITIES)
+                activity_id, activity = spooled_activity
 
-                self.activity = None
+                self.activity_sending = True
+                self.bgstally.request_manager.queue_request(url, RequestMethod.PUT, headers=self._get_headers(), payload=activity, retry_policy=RETRY_POLICY_API, priority=RequestPriority.BACKGROUND,
+                                                            callback=self._activity_sent, data={'url': self.url, 'id': activity_id})
 
             sleep(max(int(get_by_path(self.endpoints, [ENDPOINT_ACTIVITIES, 'min_period'], 0)), TIME_ACTIVITIES_WORKER_PERIOD_S))
 
 
     def _events_worker(self) -> None:
         """
-        Handle events API. If there's queued events, this worker triggers a call to the events endpoint
-        on a regular time period, sending the currently queued batch of events.
+        Handle events API. If there's spooled events, this worker triggers a call to the events endpoint
+        on a regular time period, sending the oldest batch of events.
         """
         Debug.logger.debug("Starting Events API Worker...")
 
@@ -268,20 +286,61 @@ class API:
                     or not self.events_enabled \
                     or not ENDPOINT_EVENTS in self.endpoints \
                     or not self.bgstally.request_manager.url_valid(self.url):
-                with self.events_queue.mutex:
-                    self.events_queue.queue.clear()
+                self.spool.clear_events(self.url)
+
+            # Grab the oldest spooled events up to a maximum batch size
+            batch_size:int = max(int(get_by_path(self.endpoints, [ENDPOINT_EVENTS, 'max_batch'], 0)), BATCH_EVENTS_MAX_SIZE)
+            spooled_events:list[tuple[str, dict]] = [] if self.events_sending else self.spool.get_events(self.url, batch_size)
 
-            if self.events_queue.qsize() > 0:
+            if spooled_events:
                 url:str = self.url + get_by_path(self.endpoints, [ENDPOINT_EVENTS, 'path'], ENDPOINT_EVENTS)
 
-                # Grab all available events in the queue up to a maximum batch size
-                batch_size:int = max(int(get_by_path(self.endpoints, [ENDPOINT_EVENTS, 'max_batch'], 0)), BATCH_EVENTS_MAX_SIZE)
-                queued_events:list = [self.events_queue.get(block=False) for _ in range(min(batch_size, self.events_queue.qsize()))]
-                self.bgstally.request_manager.queue_request(url, RequestMethod.POST, headers=self._get_headers(), payload=queued_events)
+                self.events_sending = True
+                self.bgstally.request_manager.queue_request(url, RequestMethod.POST, headers=self._get_headers(), payload=[event for _, event in spooled_events], retry_policy=RETRY_POLICY_API, priority=RequestPriority.BACKGROUND,
+                                                            callback=self._events_sent, data={'url': self.url, 'ids': [event_id for event_id, _ in spooled_events]})
 
             sleep(max(int(get_by_path(self.endpoints, [ENDPOINT_EVENTS, 'min_period'], 0)), TIME_EVENTS_WORKER_PERIOD_S))
 
 
+    def _activity_sent(self, success:bool, response:Response, request:BGSTallyRequest):
+        """
+        An activity request has completed. The activity stays spooled to be sent again later unless the server received it.
+        """
+        try:
+            if success or self._is_rejected(response):
+                self.spool.remove_activity(request.data['url'], request.data['id'], request.payload)
+                self.bgstally.save_manager.queue_save()
+        finally:
+            # Always allow the next send, otherwise the activities worker would stop sending for good
+            self.activity_sending = False
+
+
+    def _events_sent(self, success:bool, response:Response, request:BGSTallyRequest):
+        """
+        An events request has completed. The events stay spooled to be sent again later unless the server received them.
+        """
+        try:
+            if success or self._is_rejected(response):
+                self.spool.remove_events(request.data['url'], request.data['ids'])
+                self.bgstally.save_manager.queue_save()
+        finally:
+            # Always allow the next send, otherwise the events worker would stop sending for good
+            self.events_sending = False
+
+
+    def _is_rejected(self, response:Response|None) -> bool:
+        """
+        Return True if the server rejected a request and sending it again won't help
+        """
+        if response is None or response.ok or response.status_code in RETRY_STATUSES: return False
+
+        if 400 <= response.status_code < 500:
+            Debug.logger.warning(f"API request rejected by {self.url}, discarding. Reason: '{response.reason}'")
+            return True
+
+        return False
+
+
     def _get_headers(self) -> dict:
         """
         Get the API headers
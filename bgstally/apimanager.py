@@ -2,10 +2,12 @@ import json
 from datetime import datetime
 from os import path
 
-from bgstally.activity import Activity
+from bgstally.activity import MISSION_POINTS_WEIGHTS, Activity
 from bgstally.api import API
+from bgstally.apispool import APISpool
 from bgstally.constants import DATETIME_FORMAT_JOURNAL, FOLDER_OTHER_DATA
 from bgstally.debug import Debug
+from bgstally.savemanager import FileWrite
 from bgstally.utils import get_by_path
 
 FILENAME = "apis.json"
@@ -22,12 +24,18 @@ class APIManager:
         self.apis:list[API] = []
         self.api_updated:bool = False
 
+        # Activity and events waiting to be sent to the APIs, kept on disk so they are sent even if EDMC is closed first
+        self.spool:APISpool = APISpool(self.bgstally)
+
         self.load()
 
         if len(self.apis) == 0:
             # TODO: For the moment, ensure one API is created. Will need to manage multiple in the UI, and likely
             # not create one by default.
-            self.apis.append(API(self.bgstally))
+            self.apis.append(API(self.bgstally, self.spool))
+
+        # Anything spooled for an API that no longer exists will never be sent
+        self.spool.retain_apis({api.url for api in self.apis})
 
 
     def load(self):
@@ -41,23 +49,31 @@ class APIManager:
                     apis_json:list = json.load(json_file)
 
                 for api_json in apis_json:
-                    self.apis.append(API(self.bgstally, api_json))
+                    self.apis.append(API(self.bgstally, self.spool, api_json))
             except Exception as e:
                 Debug.logger.info(f"Unable to load {file}")
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save all APIs to disk
+        Prepare all APIs and the spool to be saved, if they have changed
         """
+        writes:list[FileWrite] = self.spool.prepare_save()
+
+        if not any(api.dirty for api in self.apis): return writes
+
         apis_json:list = []
 
         for api in self.apis:
             apis_json.append(api.as_dict())
 
         file:str = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
-        with open(file, 'w') as outfile:
-            json.dump(apis_json, outfile)
+        writes.append(FileWrite(file, json.dumps(apis_json)))
+
+        for api in self.apis:
+            api.dirty = False
+
+        return writes
 
 
     def send_activity(self, activity:Activity, cmdr:str):
@@ -69,9 +85,16 @@ class APIManager:
             api.send_activity(api_activity)
 
 
+    def wants_event(self, event_name:str) -> bool:
+        """
+        Return True if any API is set up to receive the given journal event
+        """
+        return any(api.wants_event(event_name) for api in self.apis)
+
+
     def send_event(self, event:dict, activity:Activity, cmdr:str, mission:dict):
         """
-        Event has been received. Add it to the events queue.
+        Event has been received. Spool it for all APIs.
         """
         api_event:dict = self._build_api_event(event, activity, cmdr, mission)
         for api in self.apis:
@@ -93,7 +116,7 @@ class APIManager:
         for system in activity.systems.values():
             api_system:dict = {
                 'name': system.get('System', ""),
-                'address': system.get('SystemAddress', ""),
+                'address': self._api_system_address(system.get('SystemAddress', "")),
                 'factions': [],
                 'twkills': {}
             }
@@ -105,21 +128,21 @@ class APIManager:
                     'stations': []
                 }
 
-                if faction.get('Bounties', "0") != "0": api_faction['bvs'] = faction['Bounties']
-                if faction.get('CombatBonds', "0") != "0": api_faction['cbs'] = faction['CombatBonds']
-                if faction.get('ExoData', "0") != "0": api_faction['exobiology'] = faction['ExoData']
-                if faction.get('CartData', "0") != "0": api_faction['exploration'] = faction['CartData']
-                if faction.get('Scenarios', "0") != "0": api_faction['scenarios'] = faction['Scenarios']
-                inf_primary:int = sum((1 if k == 'm' else int(k)) * int(v) for k, v in faction['MissionPoints'].items())
-                inf_secondary:int = sum((1 if k == 'm' else int(k)) * int(v) for k, v in faction['MissionPointsSecondary'].items())
+                if faction.get('Bounties', 0) != 0: api_faction['bvs'] = faction['Bounties']
+                if faction.get('CombatBonds', 0) != 0: api_faction['cbs'] = faction['CombatBonds']
+                if faction.get('ExoData', 0) != 0: api_faction['exobiology'] = faction['ExoData']
+                if faction.get('CartData', 0) != 0: api_faction['exploration'] = faction['CartData']
+                if faction.get('Scenarios', 0) != 0: api_faction['scenarios'] = faction['Scenarios']
+                inf_primary:int = sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in faction['MissionPoints'].items())
+                inf_secondary:int = sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in faction['MissionPointsSecondary'].items())
                 if inf_primary != 0: api_faction['infprimary'] = str(inf_primary)
                 if inf_secondary != 0: api_faction['infsecondary'] = str(inf_secondary)
-                if faction.get('MissionFailed', "0") != "0": api_faction['missionfails'] = faction['MissionFailed']
-                if faction.get('GroundMurdered', "0") != "0": api_faction['murdersground'] = faction['GroundMurdered']
-                if faction.get('Murdered', "0") != "0": api_faction['murdersspace'] = faction['Murdered']
-                if faction.get('BlackMarketProfit', "0") != "0": api_faction['tradebm'] = faction['BlackMarketProfit']
+                if faction.get('MissionFailed', 0) != 0: api_faction['missionfails'] = faction['MissionFailed']
+                if faction.get('GroundMurdered', 0) != 0: api_faction['murdersground'] = faction['GroundMurdered']
+                if faction.get('Murdered', 0) != 0: api_faction['murdersspace'] = faction['Murdered']
+                if faction.get('BlackMarketProfit', 0) != 0: api_faction['tradebm'] = faction['BlackMarketProfit']
 
-                if sum(int(d['value']) for d in faction['TradeBuy']) > 0:
+                if sum(d['value'] for d in faction['TradeBuy']) > 0:
                     api_faction['tradebuy'] = {
                         'low': {
                             'items': faction['TradeBuy'][2]['items'],
@@ -131,7 +154,7 @@ class APIManager:
                         }
                     }
 
-                if sum(int(d['value']) for d in faction['TradeSell']) > 0:
+                if sum(d['value'] for d in faction['TradeSell']) > 0:
                     api_faction['tradesell'] = {
                         'zero': {
                             'items': faction['TradeSell'][0]['items'],
@@ -193,13 +216,13 @@ class APIManager:
                         if station.get('cargo', {}).get('count', 0) > 0:
                             api_station['twcargo'] = station['cargo'] # dict containing 'count' and 'sum'
 
-                        if sum(int(d['count']) for d in station['escapepods'].values()) > 0:
+                        if sum(d['count'] for d in station['escapepods'].values()) > 0:
                             api_station['twescapepods'] = {
                                 'low': station['escapepods']['l'],    # dict containing 'count' and 'sum'
                                 'medium': station['escapepods']['m'], # dict containing 'count' and 'sum'
                                 'high': station['escapepods']['h']    # dict containing 'count' and 'sum'
                             }
-                        if sum(int(d['count']) for d in station['massacre'].values()) > 0:
+                        if sum(d['count'] for d in station['massacre'].values()) > 0:
                             api_station['twmassacre'] = {
                                 'basilisk': station['massacre']['b'], # dict containing 'count' and 'sum'
                                 'cyclops': station['massacre']['c'],  # dict containing 'count' and 'sum'
@@ -208,7 +231,7 @@ class APIManager:
                                 'orthrus': station['massacre']['o'],  # dict containing 'count' and 'sum'
                                 'scout': station['massacre']['s']     # dict containing 'count' and 'sum'
                             }
-                        if sum(int(d['count']) for d in station['passengers'].values()) > 0:
+                        if sum(d['count'] for d in station['passengers'].values()) > 0:
                             api_station['twpassengers'] = {
                                 'low': station['passengers']['l'],    # dict containing 'count' and 'sum'
                                 'medium': station['passengers']['m'], # dict containing 'count' and 'sum'
@@ -235,7 +258,7 @@ class APIManager:
                     'scythe-glaive': system['TWKills'].get('sg', 0)
                 }
 
-            if sum(int(d['delivered']) for d in system.get('TWSandR', {}).values()) > 0:
+            if sum(d['delivered'] for d in system.get('TWSandR', {}).values()) > 0:
                 api_system['twsandr'] = {
                     'damagedpods': system['TWSandR']['dp']['delivered'],
                     'occupiedpods': system['TWSandR']['op']['delivered'],
@@ -270,7 +293,7 @@ class APIManager:
         # Other global enhancements
         if 'StationFaction' not in event: event['StationFaction'] = {'Name': self.bgstally.state.station_faction}
         if 'StarSystem' not in event: event['StarSystem'] = get_by_path(activity.systems, [self.bgstally.state.current_system_id, 'System'], "")
-        if 'SystemAddress' not in event: event['SystemAddress'] = self.bgstally.state.current_system_id
+        if 'SystemAddress' not in event: event['SystemAddress'] = self._api_system_address(self.bgstally.state.current_system_id)
 
         # Event-specific enhancements
         match event.get('event'):
@@ -292,6 +315,13 @@ class APIManager:
         return event
 
 
+    def _api_system_address(self, system_address: str) -> int|str:
+        """
+        We store SystemAddresses as str, but the API uses the journal's int SystemAddress
+        """
+        return int(system_address) if system_address.isdigit() else system_address
+
+
     def _filter_localised(self, d: dict[str, any]) -> dict[str, any]:
         """
         Recursively remove any dict keys with names ending `_Localised` from a dict.
@@ -0,0 +1,309 @@
+import json
+from collections import OrderedDict
+from hashlib import sha1
+from itertools import islice
+from os import path
+from threading import Lock
+
+from bgstally.constants import FILE_SUFFIX, FILE_SUFFIX_LOG, FOLDER_OTHER_DATA
+from bgstally.debug import Debug
+from bgstally.savemanager import FileWrite
+
+FILENAME = "apispool"
+# Maximum number of unsent events kept for each API. The oldest are discarded first.
+SPOOL_MAX_EVENTS = 1000
+# Maximum number of unsent activity updates kept for each API, one per CMDR and tick. The oldest are discarded first.
+SPOOL_MAX_ACTIVITIES = 10
+# Number of change log records, or size of the change log in bytes, before we write a full snapshot and start a new log
+SPOOL_LOG_MAX_RECORDS = 200
+SPOOL_LOG_MAX_SIZE = 1024 * 1024
+
+
+class APISpool:
+    """
+    Holds the activity and events waiting to be sent to each API, keyed by API URL, so they survive EDMC being closed or
+    crashing. Items stay in the spool until the server has received them. Changes are appended to a change log on save,
+    and a full snapshot is written periodically. Thread safe, as items are added on the main thread and removed from the
+    request threads.
+    """
+    def __init__(self, bgstally):
+        self.bgstally = bgstally
+
+        # key = API URL, value = OrderedDict of unsent events. key = event ID, value = event. Oldest first.
+        self.events:dict[str, OrderedDict] = {}
+        # key = API URL, value = OrderedDict of unsent activity. key = CMDR and tick ID, value = activity. Oldest first.
+        self.activities:dict[str, OrderedDict] = {}
+
+        self.lock:Lock = Lock()
+        self.dirty:bool = False # True if a full snapshot should be written on next save
+        self.log_generation:int = 0 # Incremented on each full snapshot, change log records from older generations are ignored
+        self.log_records:int = 0 # Number of records in the change log since the last full snapshot
+        self.log_size:int = 0 # Size of the change log in bytes
+        self.pending_records:list[dict] = [] # Changes since the last save, appended to the change log on next save
+
+        self.load()
+
+
+    def load(self):
+        """
+        Load the spool snapshot, then replay any changes from its change log
+        """
+        filepath:str = self._get_filepath()
+
+        if path.exists(filepath):
+            try:
+                with open(filepath) as spoolfile:
+                    data:dict = json.load(spoolfile)
+
+                self.log_generation = data.get('gen', 0)
+                for url, api_data in data.get('apis', {}).items():
+                    self.events[url] = OrderedDict(api_data.get('events', []))
+                    self.activities[url] = OrderedDict(api_data.get('activities', []))
+            except Exception as e:
+                Debug.logger.warning(f"Unable to load {filepath}", exc_info=e)
+
+        self._replay_log(self._get_log_filepath())
+
+        events_count:int = sum(len(events) for events in self.events.values())
+        activities_count:int = sum(len(activities) for activities in self.activities.values())
+        if events_count > 0 or activities_count > 0:
+            Debug.logger.info(f"Resuming {events_count} unsent API events and {activities_count} unsent API activity updates")
+
+
+    def prepare_save(self) -> list[FileWrite]:
+        """
+        Prepare the spool to be saved. If there are only a few changes since the last snapshot, append them to the change
+        log rather than rewriting the whole spool. The changes are taken while holding the lock, and serialised after
+        releasing it.
+        """
+        snapshot:dict|None = None
+        lines:str = ""
+
+        with self.lock:
+            if not self.dirty and not self.pending_records: return []
+
+            if self.dirty \
+                    or self.log_records + len(self.pending_records) > SPOOL_LOG_MAX_RECORDS \
+                    or self.log_size > SPOOL_LOG_MAX_SIZE:
+                self.log_generation += 1
+                # Events and activity are never modified once spooled, so a shallow copy is a consistent snapshot
+                snapshot = self._as_dict()
+
+                self.dirty = False
+                self.log_records = 0
+                self.log_size = 0
+            else:
+                lines = "".join(json.dumps({'gen': self.log_generation} | record, separators=(',', ':')) + "\n" for record in self.pending_records)
+
+                self.log_records += len(self.pending_records)
+                self.log_size += len(lines)
+
+            self.pending_records = []
+
+        if snapshot is not None:
+            return [FileWrite(self._get_filepath(), json.dumps(snapshot, separators=(',', ':'))),
+                    FileWrite(self._get_log_filepath(), None)]
+        else:
+            return [FileWrite(self._get_log_filepath(), lines, append=True)]
+
+
+    def put_event(self, url:str, event:dict):
+        """
+        Add an event to be sent to an API. An identical event that is already waiting to be sent is not added again.
+        """
+        event_id:str = sha1(json.dumps(event, sort_keys=True).encode('utf-8')).hexdigest()
+
+        with self.lock:
+            events:OrderedDict = self.events.setdefault(url, OrderedDict())
+            if event_id in events: return
+
+            events[event_id] = event
+            self._add_record(url, 'event', event_id, event)
+
+            while len(events) > SPOOL_MAX_EVENTS:
+                discarded_id, _ = events.popitem(last=False)
+                Debug.logger.warning(f"Too many unsent events for {url}, discarding the oldest")
+                self._add_record(url, 'remove', discarded_id)
+
+
+    def put_activity(self, url:str, activity:dict):
+        """
+        Add activity to be sent to an API. Replaces any unsent activity for the same CMDR and tick, as each update
+        contains the complete activity for the tick.
+        """
+        activity_id:str = f"{activity.get('cmdr')}/{activity.get('tickid')}"
+
+        with self.lock:
+            activities:OrderedDict = self.activities.setdefault(url, OrderedDict())
+            activities[activity_id] = activity
+            activities.move_to_end(activity_id)
+
+            # Only the latest activity for each CMDR and tick needs writing to the change log
+            self.pending_records = [record for record in self.pending_records
+                                    if not (record['op'] == 'activity' and record['url'] == url and record['id'] == activity_id)]
+            self._add_record(url, 'activity', activity_id, activity)
+
+            while len(activities) > SPOOL_MAX_ACTIVITIES:
+                discarded_id, _ = activities.popitem(last=False)
+                Debug.logger.warning(f"Too many unsent activity updates for {url}, discarding the oldest")
+                self._add_record(url, 'remove', discarded_id)
+
+
+    def get_events(self, url:str, count:int) -> list[tuple[str, dict]]:
+        """
+        Get up to count of the oldest unsent events for an API, as a list of (event ID, event)
+        """
+        with self.lock:
+            return list(islice(self.events.get(url, {}).items(), count))
+
+
+    def get_activity(self, url:str) -> tuple[str, dict]|None:
+        """
+        Get the oldest unsent activity for an API, as (activity ID, activity), or None if there is none
+        """
+        with self.lock:
+            activities:OrderedDict = self.activities.get(url, {})
+            return next(iter(activities.items()), None)
+
+
+    def remove_events(self, url:str, event_ids:list[str]):
+        """
+        Remove events that have been sent
+        """
+        with self.lock:
+            events:OrderedDict = self.events.get(url, {})
+            for event_id in event_ids:
+                if events.pop(event_id, None) is not None: self._add_record(url, 'remove', event_id)
+
+
+    def remove_activity(self, url:str, activity_id:str, activity:dict):
+        """
+        Remove activity that has been sent. Newer activity for the same CMDR and tick, added while this activity was being
+        sent, is kept.
+        """
+        with self.lock:
+            activities:OrderedDict = self.activities.get(url, {})
+            if activities.get(activity_id) is activity:
+                del activities[activity_id]
+                self._add_record(url, 'remove', activity_id)
+
+
+    def clear_events(self, url:str):
+        """
+        Discard all unsent events for an API
+        """
+        with self.lock:
+            if not self.events.get(url): return
+            self.events[url].clear()
+            self._add_record(url, 'clearevents')
+
+
+    def clear_activities(self, url:str):
+        """
+        Discard all unsent activity for an API
+        """
+        with self.lock:
+            if not self.activities.get(url): return
+            self.activities[url].clear()
+            self._add_record(url, 'clearactivities')
+
+
+    def retain_apis(self, urls:set[str]):
+        """
+        Discard everything waiting to be sent to APIs other than those given, e.g. if an API's URL has been changed
+        """
+        for url in (self.events.keys() | self.activities.keys()) - urls:
+            self.clear_events(url)
+            self.clear_activities(url)
+
+
+    def _add_record(self, url:str, op:str, item_id:str|None = None, item:dict|None = None):
+        """
+        Record a change to be appended to the change log on next save. Must be called with the lock held.
+        """
+        record:dict = {'url': url, 'op': op}
+        if item_id is not None: record['id'] = item_id
+        if item is not None: record['item'] = item
+        self.pending_records.append(record)
+
+
+    def _apply_record(self, record:dict):
+        """
+        Apply a change log record
+        """
+        url:str = record['url']
+        events:OrderedDict = self.events.setdefault(url, OrderedDict())
+        activities:OrderedDict = self.activities.setdefault(url, OrderedDict())
+
+        match record['op']:
+            case 'event':
+                events[record['id']] = record['item']
+            case 'activity':
+                activities[record['id']] = record['item']
+                activities.move_to_end(record['id'])
+            case 'remove':
+                events.pop(record['id'], None)
+                activities.pop(record['id'], None)
+            case 'clearevents':
+                events.clear()
+            case 'clearactivities':
+                activities.clear()
+
+
+    def _replay_log(self, log_filepath:str):
+        """
+        Apply all records from the change log that belong to our current snapshot generation
+        """
+        if not path.exists(log_filepath): return
+
+        try:
+            self.log_size = path.getsize(log_filepath)
+
+            with open(log_filepath, encoding='utf-8') as logfile:
+                for line in logfile:
+                    try:
+                        record:dict = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A partially written final record, from a crash during an append. Take a fresh snapshot on next
+                        # save so we don't append after it.
+                        Debug.logger.warning(f"Ignoring incomplete record in {log_filepath}")
+                        self.dirty = True
+                        break
+
+                    # Records from an older generation were written before a snapshot that already contains them
+                    if record.get('gen') != self.log_generation: continue
+
+                    self._apply_record(record)
+                    self.log_records += 1
+        except Exception as e:
+            Debug.logger.warning(f"Unable to replay {log_filepath}", exc_info=e)
+            self.dirty = True
+
+
+    def _as_dict(self) -> dict:
+        """
+        Return a dict containing the whole spool, omitting APIs with nothing waiting to be sent
+        """
+        apis:dict = {}
+        for url in self.events.keys() | self.activities.keys():
+            events:OrderedDict = self.events.get(url, {})
+            activities:OrderedDict = self.activities.get(url, {})
+            if not events and not activities: continue
+
+            apis[url] = {'events': list(events.items()), 'activities': list(activities.items())}
+
+        return {'gen': self.log_generation, 'apis': apis}
+
+
+    def _get_filepath(self) -> str:
+        """
+        Return the spool snapshot file path
+        """
+        return path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME + FILE_SUFFIX)
+
+
+    def _get_log_filepath(self) -> str:
+        """
+        Return the spool change log file path
+        """
+        return path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME + FILE_SUFFIX_LOG)
@@ -21,6 +21,7 @@ from bgstally.market import Market
 from bgstally.missionlog import MissionLog
 from bgstally.overlay import Overlay
 from bgstally.requestmanager import RequestManager
+from bgstally.savemanager import SaveManager
 from bgstally.state import State
 from bgstally.targetmanager import TargetManager
 from bgstally.tick import Tick
@@ -90,6 +91,17 @@ class BGSTally:
         self.update_manager: UpdateManager = UpdateManager(self)
         self.ui: UI = UI(self)
         self.formatter_manager: ActivityFormatterManager = ActivityFormatterManager(self)
+
+        # Registry of all objects that persist data. Each tracks its own dirty state and only writes to disk when changed.
+        # State is not included because it accesses tk variables, so must be saved on the main thread.
+        self.stores: list = [self.mission_log, self.target_manager, self.tick, self.activity_manager,
+                             self.fleet_carrier, self.api_manager, self.webhook_manager]
+        self.save_manager: SaveManager = SaveManager(self, self.stores)
+
+        # Journal event handlers. key = event name, value = list of (guard, handler, dirty) tuples
+        self.journal_handlers: dict[str, list[tuple]] = {}
+        self._register_journal_handlers()
+
         self.thread: Thread = Thread(target=self._worker, name="BGSTally Main worker")
         self.thread.daemon = True
         self.thread.start()
@@ -107,6 +119,12 @@ class BGSTally:
         """
         Parse an incoming journal entry and store the data we need
         """
+        event_name: str = entry.get('event')
+        handlers: list|None = self.journal_handlers.get(event_name)
+        send_event: bool = self.api_manager.wants_event(event_name)
+
+        # The large majority of journal events are of no interest to us or our APIs, so bail out as early as possible
+        if handlers is None and not send_event: return
 
         # Live galaxy check
         try:
@@ -115,162 +133,38 @@ class BGSTally:
             self.debug.logger.error(f"The EDMC Version is too old, please upgrade to v5.6.0 or later", exc_info=e)
             return
 
-        activity: Activity = self.activity_manager.get_current_activity()
-        dirty: bool = False
-
-        if entry.get('event') in ['StartUp', 'Location', 'FSDJump', 'CarrierJump']:
-            activity.system_entered(entry, self.state)
-            dirty = True
-
-        mission:dict = self.mission_log.get_mission(entry.get('MissionID'))
-
-        match entry.get('event'):
-            case 'ApproachSettlement' if state['Odyssey']:
-                activity.settlement_approached(entry, self.state)
-                dirty = True
-
-            case 'Bounty':
-                activity.bv_received(entry, self.state)
-                dirty = True
-
-            case 'CapShipBond':
-                activity.cap_ship_bond_received(entry)
-                dirty = True
-
-            case 'Cargo':
-                activity.cargo(entry)
-
-            case 'CarrierJumpCancelled':
-                self.fleet_carrier.jump_cancelled()
-
-            case 'CarrierJumpRequest':
-                self.fleet_carrier.jump_requested(entry)
-
-            case 'CarrierStats':
-                self.fleet_carrier.stats_received(entry)
-
-            case 'CarrierTradeOrder':
-                self.fleet_carrier.trade_order(entry)
-
-            case 'CollectCargo':
-                activity.cargo_collected(entry, self.state)
-                dirty = True
-
-            case 'CommitCrime':
-                activity.crime_committed(entry, self.state)
-                dirty = True
-
-            case 'Died':
-                self.target_manager.died(entry, system)
-
-            case 'Docked':
-                self.state.station_faction = get_by_path(entry, ['StationFaction', 'Name'], self.state.station_faction) # Default to existing value
-                self.state.station_type = entry.get('StationType', "")
-                dirty = True
-
-            case 'EjectCargo':
-                activity.cargo_ejected(entry)
-                dirty = True
-
-            case 'FactionKillBond' if state['Odyssey']:
-                activity.cb_received(entry, self.state)
-                dirty = True
-
-            case 'Friends' if entry.get('Status') == "Requested":
-                self.target_manager.friend_request(entry, system)
-
-            case 'Friends' if entry.get('Status') == "Added":
-                self.target_manager.friend_added(entry, system)
-
-            case 'Interdicted':
-                self.target_manager.interdicted(entry, system)
-
-            case 'Location' | 'StartUp' if entry.get('Docked') == True:
-                self.state.station_faction = get_by_path(entry, ['StationFaction', 'Name'], self.state.station_faction) # Default to existing value
-                self.state.station_type = entry.get('StationType', "")
-                dirty = True
-
-            case 'Market':
-                self.market.load()
-
-            case 'MarketBuy':
-                activity.trade_purchased(entry, self.state)
-                dirty = True
-
-            case 'MarketSell':
-                activity.trade_sold(entry, self.state)
-                dirty = True
+        # Hold the save lock while we modify data, so a background save never sees part-processed events
+        with self.save_manager.lock:
+            activity: Activity = self.activity_manager.get_current_activity()
+            dirty: bool = False
 
-            case 'MissionAbandoned':
-                self.mission_log.delete_mission_by_id(entry.get('MissionID'))
-                dirty = True
+            # Fetch the mission before any handlers run, as some remove it from the mission log
+            mission: dict|None = None
+            if send_event and 'MissionID' in entry: mission = self.mission_log.get_mission(entry['MissionID'])
 
-            case 'MissionAccepted':
-                self.mission_log.add_mission(entry.get('Name', ""), entry.get('Faction', ""), entry.get('MissionID', ""), entry.get('Expiry', ""),
-                                             entry.get('DestinationSystem', ""), entry.get('DestinationSettlement', ""), system, station,
-                                             entry.get('Count', -1), entry.get('PassengerCount', -1), entry.get('KillCount', -1),
-                                             entry.get('TargetFaction', ""))
-                dirty = True
+            for guard, handler, handler_dirty in handlers or []:
+                if guard is not None and not guard(entry, state): continue
+                handler(entry, activity, system, station)
+                dirty = dirty or handler_dirty
 
-            case 'MissionCompleted':
-                activity.mission_completed(entry, self.mission_log)
-                dirty = True
+            if dirty:
+                self.state.save()
+                self.save_manager.queue_save()
+                self.api_manager.send_activity(activity, cmdr)
 
-            case 'MissionFailed':
-                activity.mission_failed(entry, self.mission_log)
-                dirty = True
+            if send_event: self.api_manager.send_event(entry, activity, cmdr, mission)
 
-            case 'ReceiveText':
-                self.target_manager.received_text(entry, system)
 
-            case 'RedeemVoucher' if entry.get('Type') == 'bounty':
-                activity.bv_redeemed(entry, self.state)
-                dirty = True
-
-            case 'RedeemVoucher' if entry.get('Type') == 'CombatBond':
-                activity.cb_redeemed(entry, self.state)
-                dirty = True
-
-            case 'Resurrect':
-                activity.player_resurrected()
-                dirty = True
-
-            case 'SearchAndRescue':
-                activity.search_and_rescue(entry, self.state)
-                dirty = True
-
-            case 'SellExplorationData' | 'MultiSellExplorationData':
-                activity.exploration_data_sold(entry, self.state)
-                dirty = True
-
-            case 'SellOrganicData':
-                activity.organic_data_sold(entry, self.state)
-                dirty = True
-
-            case 'ShipTargeted':
-                activity.ship_targeted(entry, self.state)
-                self.target_manager.ship_targeted(entry, system)
-                dirty = True
-
-            case 'SupercruiseDestinationDrop':
-                activity.destination_dropped(entry, self.state)
-                dirty = True
-
-            case 'SupercruiseEntry':
-                activity.supercruise(entry, self.state)
-
-            case 'Undocked' if entry.get('Taxi') == False:
-                self.state.station_faction = ""
-                self.state.station_type = ""
-
-            case 'WingInvite':
-                self.target_manager.team_invite(entry, system)
-
-        if dirty:
-            self.save_data()
-            self.api_manager.send_activity(activity, cmdr)
+    def register_journal_handler(self, events: list[str], handler: callable, guard: callable = None, dirty: bool = True):
+        """
+        Register a handler for one or more journal events. The handler is called as handler(entry, activity, system, station).
 
-        self.api_manager.send_event(entry, activity, cmdr, mission)
+        If a guard is given, it is called as guard(entry, state) and the handler is only called if the guard returns True.
+        dirty should be True if the handler changes data that needs to be saved and sent to APIs. All handlers registered
+        for an event whose guards pass are called, in the order they were registered.
+        """
+        for event in events:
+            self.journal_handlers.setdefault(event, []).append((guard, handler, dirty))
 
 
     def capi_fleetcarrier(self, data: CAPIData):
@@ -283,7 +177,10 @@ class BGSTally:
         if data.source_host != SERVER_LIVE:
             return
 
-        self.fleet_carrier.update(data.data)
+        with self.save_manager.lock:
+            self.fleet_carrier.update(data.data)
+
+        self.save_manager.queue_save()
         self.ui.update_plugin_frame()
 
 
@@ -309,25 +206,23 @@ class BGSTally:
 
     def save_data(self):
         """
-        Save all data structures
+        Save all data structures immediately. Only those stores that have changed since they were last saved are written.
         """
-        # TODO: Don't need to save all this all the time, be more selective
-        self.mission_log.save()
-        self.target_manager.save()
-        self.tick.save()
-        self.activity_manager.save()
         self.state.save()
-        self.fleet_carrier.save()
-        self.api_manager.save()
-        self.webhook_manager.save()
+        self.save_manager.flush()
 
 
     def new_tick(self, force: bool, uipolicy: UpdateUIPolicy):
         """
         Start a new tick.
         """
-        if force: self.tick.force_tick()
-        if not self.activity_manager.new_tick(self.tick, force): return
+        with self.save_manager.lock:
+            if force: self.tick.force_tick()
+            if not self.activity_manager.new_tick(self.tick, force): return
+
+        # Make sure the tick and the rolled-over activity are on disk without waiting for the next background save. This
+        # must be done after releasing the save lock, as saving always takes the write lock first.
+        self.save_manager.flush()
 
         match uipolicy:
             case UpdateUIPolicy.IMMEDIATE:
@@ -338,6 +233,76 @@ class BGSTally:
         self.overlay.display_message("tickwarn", _("NEW TICK DETECTED!"), True, 180, "green") # LANG: Overlay message
 
 
+    def _register_journal_handlers(self):
+        """
+        Register handlers for all the journal events we process
+        """
+        register = self.register_journal_handler
+        odyssey = lambda e, s: s['Odyssey']
+
+        register(['StartUp', 'Location', 'FSDJump', 'CarrierJump'], lambda e, a, sy, st: a.system_entered(e, self.state))
+        register(['ApproachSettlement'], lambda e, a, sy, st: a.settlement_approached(e, self.state), guard=odyssey)
+        register(['Bounty'], lambda e, a, sy, st: a.bv_received(e, self.state))
+        register(['CapShipBond'], lambda e, a, sy, st: a.cap_ship_bond_received(e))
+        register(['Cargo'], lambda e, a, sy, st: a.cargo(e), dirty=False)
+        register(['CarrierJumpCancelled'], lambda e, a, sy, st: self.fleet_carrier.jump_cancelled(), dirty=False)
+        register(['CarrierJumpRequest'], lambda e, a, sy, st: self.fleet_carrier.jump_requested(e), dirty=False)
+        register(['CarrierStats'], lambda e, a, sy, st: self.fleet_carrier.stats_received(e), dirty=False)
+        register(['CarrierTradeOrder'], lambda e, a, sy, st: self.fleet_carrier.trade_order(e), dirty=False)
+        register(['CollectCargo'], lambda e, a, sy, st: a.cargo_collected(e, self.state))
+        register(['CommitCrime'], lambda e, a, sy, st: a.crime_committed(e, self.state))
+        register(['Died'], lambda e, a, sy, st: self.target_manager.died(e, sy), dirty=False)
+        register(['Docked'], lambda e, a, sy, st: self._station_docked(e))
+        register(['EjectCargo'], lambda e, a, sy, st: a.cargo_ejected(e))
+        register(['FactionKillBond'], lambda e, a, sy, st: a.cb_received(e, self.state), guard=odyssey)
+        register(['Friends'], lambda e, a, sy, st: self.target_manager.friend_request(e, sy), guard=lambda e, s: e.get('Status') == "Requested", dirty=False)
+        register(['Friends'], lambda e, a, sy, st: self.target_manager.friend_added(e, sy), guard=lambda e, s: e.get('Status') == "Added", dirty=False)
+        register(['Interdicted'], lambda e, a, sy, st: self.target_manager.interdicted(e, sy), dirty=False)
+        register(['Location', 'StartUp'], lambda e, a, sy, st: self._station_docked(e), guard=lambda e, s: e.get('Docked') == True)
+        register(['Market'], lambda e, a, sy, st: self.market.load(), dirty=False)
+        register(['MarketBuy'], lambda e, a, sy, st: a.trade_purchased(e, self.state))
+        register(['MarketSell'], lambda e, a, sy, st: a.trade_sold(e, self.state))
+        register(['MissionAbandoned'], lambda e, a, sy, st: self.mission_log.delete_mission_by_id(e.get('MissionID')))
+        register(['MissionAccepted'], lambda e, a, sy, st: self.mission_log.add_mission(
+            e.get('Name', ""), e.get('Faction', ""), e.get('MissionID', ""), e.get('Expiry', ""),
+            e.get('DestinationSystem', ""), e.get('DestinationSettlement', ""), sy, st,
+            e.get('Count', -1), e.get('PassengerCount', -1), e.get('KillCount', -1),
+            e.get('TargetFaction', "")))
+        register(['MissionCompleted'], lambda e, a, sy, st: a.mission_completed(e, self.mission_log))
+        register(['MissionFailed'], lambda e, a, sy, st: a.mission_failed(e, self.mission_log))
+        register(['ReceiveText'], lambda e, a, sy, st: self.target_manager.received_text(e, sy), dirty=False)
+        register(['RedeemVoucher'], lambda e, a, sy, st: a.bv_redeemed(e, self.state), guard=lambda e, s: e.get('Type') == 'bounty')
+        register(['RedeemVoucher'], lambda e, a, sy, st: a.cb_redeemed(e, self.state), guard=lambda e, s: e.get('Type') == 'CombatBond')
+        register(['Resurrect'], lambda e, a, sy, st: a.player_resurrected())
+        register(['SearchAndRescue'], lambda e, a, sy, st: a.search_and_rescue(e, self.state))
+        register(['SellExplorationData', 'MultiSellExplorationData'], lambda e, a, sy, st: a.exploration_data_sold(e, self.state))
+        register(['SellOrganicData'], lambda e, a, sy, st: a.organic_data_sold(e, self.state))
+        register(['ShipTargeted'], lambda e, a, sy, st: a.ship_targeted(e, self.state))
+        register(['ShipTargeted'], lambda e, a, sy, st: self.target_manager.ship_targeted(e, sy))
+        register(['SupercruiseDestinationDrop'], lambda e, a, sy, st: a.destination_dropped(e, self.state))
+        register(['SupercruiseEntry'], lambda e, a, sy, st: a.supercruise(e, self.state), dirty=False)
+        register(['Undocked'], lambda e, a, sy, st: self._station_undocked(), guard=lambda e, s: e.get('Taxi') == False, dirty=False)
+        register(['WingInvite'], lambda e, a, sy, st: self.target_manager.team_invite(e, sy), dirty=False)
+
+
+    def _station_docked(self, entry: dict):
+        """
+        We are docked at a station, either from a Docked event or from being docked at startup
+        """
+        self.state.station_faction = get_by_path(entry, ['StationFaction', 'Name'], self.state.station_faction) # Default to existing value
+        self.state.station_type = entry.get('StationType', "")
+        self.state.dirty = True
+
+
+    def _station_undocked(self):
+        """
+        We have left a station
+        """
+        self.state.station_faction = ""
+        self.state.station_type = ""
+        self.state.dirty = True
+
+
     def _worker(self) -> None:
         """
         Handle thread work
@@ -352,3 +317,9 @@ class BGSTally:
             sleep(TIME_WORKER_PERIOD_S)
 
             self.check_tick(UpdateUIPolicy.LATER) # Must not update UI directly from a thread
+
+            # Prune expired missions and targets, so long-running sessions don't need a restart to reclaim them
+            with self.save_manager.lock:
+                expired: bool = self.mission_log.expire_old_missions()
+                expired = self.target_manager.expire_old_targets() or expired
+            if expired: self.save_manager.queue_save()
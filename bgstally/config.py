@@ -5,6 +5,8 @@ from bgstally.debug import Debug
 FOLDERNAME = "config"
 MAIN_FILENAME = "config.ini"
 USER_FILENAME = "userconfig.ini"
+INARA_CACHE_TTL_DAYS_DEFAULT = 7
+INARA_CACHE_MAX_SIZE_DEFAULT = 2000
 
 
 class Config(object):
@@ -48,6 +50,24 @@ class Config(object):
         return self.config.get('apikeys', 'sentry')
 
 
+    def inara_cache_ttl_days(self) -> int:
+        """Get the number of days to keep cached Inara CMDR profiles
+
+        Returns:
+            int: The number of days
+        """
+        return self.config.getint('inara', 'cache_ttl_days', fallback=INARA_CACHE_TTL_DAYS_DEFAULT)
+
+
+    def inara_cache_max_size(self) -> int:
+        """Get the maximum number of Inara CMDR profiles to cache
+
+        Returns:
+            int: The maximum number of profiles
+        """
+        return self.config.getint('inara', 'cache_max_size', fallback=INARA_CACHE_MAX_SIZE_DEFAULT)
+
+
     def api(self, name: str) -> dict | None:
         """Fetch all information about a given API
 
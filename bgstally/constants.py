@@ -1,5 +1,5 @@
 import sys
-from enum import Enum
+from enum import Enum, IntFlag
 
 
 # Conflict Zones
@@ -75,6 +75,26 @@ class RequestMethod(Enum):
     OPTIONS = 'options'
 
 
+# Lower values are sent first
+class RequestPriority(int, Enum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class MissionCategory(IntFlag):
+    NONE = 0
+    ELECTION = 1
+    WAR = 2
+    TW_COLLECT = 4
+    TW_EVAC_LOW = 8
+    TW_EVAC_MED = 16
+    TW_EVAC_HIGH = 32
+    TW_MASSACRE = 64
+    TW_REACTIVATE = 128
+    TW = TW_COLLECT | TW_EVAC_LOW | TW_EVAC_MED | TW_EVAC_HIGH | TW_MASSACRE | TW_REACTIVATE
+
+
 class CmdrInteractionReason(int, Enum):
     SCANNED = 0
     FRIEND_REQUEST_RECEIVED = 1
@@ -87,6 +107,7 @@ class CmdrInteractionReason(int, Enum):
 
 DATETIME_FORMAT_JOURNAL: str = "%Y-%m-%dT%H:%M:%SZ"
 FILE_SUFFIX: str = ".json"
+FILE_SUFFIX_LOG: str = ".log"
 FOLDER_ASSETS: str = "assets"
 FOLDER_BACKUPS: str = "backups"
 FOLDER_DATA: str = "data"
@@ -6,6 +6,7 @@ from os import path, remove
 from bgstally.constants import DATETIME_FORMAT_JOURNAL, FOLDER_DATA, FOLDER_OTHER_DATA, DiscordChannel, FleetCarrierItemType
 from bgstally.debug import Debug
 from bgstally.discord import DATETIME_FORMAT
+from bgstally.savemanager import FileWrite
 from bgstally.utils import _, __, get_by_path
 from thirdparty.colors import *
 
@@ -24,6 +25,7 @@ class FleetCarrier:
         self.commodities_selling:list = []
         self.commodities_buying:list = []
         self.commodities:dict = {}
+        self.dirty:bool = False
 
         self._load_commodities()
         self.load()
@@ -42,13 +44,16 @@ class FleetCarrier:
                 Debug.logger.info(f"Unable to load {file}")
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save state to file
+        Prepare state to be saved to file, if it has changed
         """
+        if not self.dirty: return []
+
         file = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
-        with open(file, 'w') as outfile:
-            json.dump(self._as_dict(), outfile)
+        text:str = json.dumps(self._as_dict())
+        self.dirty = False
+        return [FileWrite(file, text)]
 
 
     def available(self):
@@ -67,6 +72,7 @@ class FleetCarrier:
 
         # Store the whole data structure
         self.data = data
+        self.dirty = True
 
         # Name is encoded as hex string
         self.name = bytes.fromhex(get_by_path(self.data, ['name', 'vanityName'], "----")).decode('utf-8')
@@ -109,6 +115,7 @@ class FleetCarrier:
             self.name = journal_entry.get("Name")
             self.callsign = journal_entry.get("Callsign")
             self.data['dockingAccess'] = journal_entry.get("DockingAccess")
+            self.dirty = True
 
 
     def jump_requested(self, journal_entry: dict):
@@ -250,6 +257,7 @@ class FleetCarrier:
         """
         items, name_key, display_name_key, quantity_key = self._get_items(category)
         if items is None: return
+        self.dirty = True
 
         # items is returned as reference, so we are directly manipulating the appropriate list
         found:bool = False
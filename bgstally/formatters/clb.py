@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, timezone
 import time
 import traceback
 import re
-from bgstally.activity import STATES_ELECTION, STATES_WAR, Activity
+from bgstally.activity import MISSION_POINTS_WEIGHTS, STATES_ELECTION, STATES_WAR, Activity
 from bgstally.constants import CheckStates, DiscordActivity
 from bgstally.debug import Debug
 from bgstally.formatters.default import DefaultActivityFormatter
@@ -166,9 +166,9 @@ class CLBActivityFormatter(DefaultActivityFormatter):
         """
         fp: bool = not discord
 
-        inf:int = sum((1 if k == 'm' else int(k)) * int(v) for k, v in inf_data.items())
+        inf:int = sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in inf_data.items())
         if self.bgstally.state.secondary_inf:
-            inf += sum((1 if k == 'm' else int(k)) * int(v) for k, v in secondary_inf_data.items())
+            inf += sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in secondary_inf_data.items())
 
         if inf > 0:
             return f"{green('+' + str(inf), fp=fp)} {blue(__('Inf', lang), fp=fp)}"
@@ -185,7 +185,7 @@ class CLBActivityFormatter(DefaultActivityFormatter):
 
         czs = []
         for w in ['h', 'm', 'l']:
-            if w in cz_data and int(cz_data[w]) != 0:
+            if cz_data.get(w, 0) != 0:
                 czs.append(f"{green(str(cz_data[w]), fp=fp)} {red(__(w.upper()+prefix, lang), fp=fp)}")
         if len(czs) == 0:
             return ""
@@ -211,7 +211,7 @@ class CLBActivityFormatter(DefaultActivityFormatter):
                 activity.append(cz)
 
         for action, desc in {'TradeBuy': 'Spend', 'TradeSell': "Profit"}.items():
-            if sum(int(d['value']) for d in faction[action]) > 0:
+            if sum(d['value'] for d in faction[action]) > 0:
                 if not self.bgstally.state.detailed_trade:
                     tot = 0
                     for t, d in {0 : "[Z]", 1 : "[L]", 2 : "[M]", 3 : "[H]"}.items():
@@ -242,7 +242,7 @@ class CLBActivityFormatter(DefaultActivityFormatter):
                 if isinstance(faction[a], int):
                     amt = faction[a]
                 if isinstance(faction[a], dict):
-                    amt: int = sum(int(v) for k, v in faction[a].items())
+                    amt: int = sum(faction[a].values())
                 if amt > 0:
                     activity.append(f"{green(human_format(amt), fp=fp)} {__(activities[a], lang)}")
 
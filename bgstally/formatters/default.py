@@ -1,4 +1,4 @@
-from bgstally.activity import STATES_ELECTION, STATES_WAR, Activity
+from bgstally.activity import MISSION_POINTS_WEIGHTS, STATES_ELECTION, STATES_WAR, Activity
 from bgstally.constants import CheckStates, DiscordActivity
 from bgstally.debug import Debug
 from bgstally.formatters.base import FieldActivityFormatterInterface
@@ -237,7 +237,7 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
 
         # System-specific tally
         kills: int = sum(system['TWKills'].values())
-        sandr: int = sum(int(d['delivered']) for d in system['TWSandR'].values())
+        sandr: int = sum(d['delivered'] for d in system['TWSandR'].values())
         reactivate: int = system['TWReactivate']
         if kills > 0 or sandr > 0 or reactivate > 0:
             system_text += ("🍀 " if discord else "TW ") + __("System activity", lang) + "\n" # LANG: Discord heading
@@ -304,8 +304,8 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
         # Force plain text if we are not posting to Discord
         fp: bool = not discord
 
-        inf: int = sum((1 if k == 'm' else int(k)) * int(v) for k, v in inf_data.items())
-        inf_sec: int = sum((1 if k == 'm' else int(k)) * int(v) for k, v in secondary_inf_data.items())
+        inf: int = sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in inf_data.items())
+        inf_sec: int = sum(MISSION_POINTS_WEIGHTS[k] * v for k, v in secondary_inf_data.items())
 
         if inf != 0 or (inf_sec != 0 and self.bgstally.state.secondary_inf):
             if faction_state in STATES_ELECTION:
@@ -378,25 +378,25 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
 
         if not self.bgstally.state.detailed_trade:
             # Modern, simple trade report - Combine buy at all brackets and profit at all brackets
-            buy_total: int = sum(int(d['value']) for d in trade_buy)
-            profit_total: int = sum(int(d['profit']) for d in trade_sell)
+            buy_total: int = sum(d['value'] for d in trade_buy)
+            profit_total: int = sum(d['profit'] for d in trade_sell)
             text += cyan(__("TrdBuy", lang), fp=fp) + " " + green(human_format(buy_total), fp=fp) + " " if buy_total != 0 else "" # LANG: Discord heading, abbreviation for trade buy
             text += cyan(__("TrdProfit", lang), fp=fp) + " " + green(human_format(profit_total), fp=fp) + " " if profit_total != 0 else "" # LANG: Discord heading, abbreviation for trade profit
         else:
             # Modern, detailed trade report - Split into values per supply / demand bracket
-            if sum(int(d['value']) for d in trade_buy) > 0:
+            if sum(d['value'] for d in trade_buy) > 0:
                 # Buy brackets currently range from 1 - 3
                 text += cyan(__("TrdBuy", lang), fp=fp) + " "
-                if int(trade_buy[1]['value']) != 0: text += f"{'🅻' if discord else '[L]'}:{green(human_format(trade_buy[1]['value']), fp=fp)} "
-                if int(trade_buy[2]['value']) != 0: text += f"{'🅼' if discord else '[M]'}:{green(human_format(trade_buy[2]['value']), fp=fp)} "
-                if int(trade_buy[3]['value']) != 0: text += f"{'🅷' if discord else '[H]'}:{green(human_format(trade_buy[3]['value']), fp=fp)} "
-            if sum(int(d['value']) for d in trade_sell) > 0:
+                if trade_buy[1]['value'] != 0: text += f"{'🅻' if discord else '[L]'}:{green(human_format(trade_buy[1]['value']), fp=fp)} "
+                if trade_buy[2]['value'] != 0: text += f"{'🅼' if discord else '[M]'}:{green(human_format(trade_buy[2]['value']), fp=fp)} "
+                if trade_buy[3]['value'] != 0: text += f"{'🅷' if discord else '[H]'}:{green(human_format(trade_buy[3]['value']), fp=fp)} "
+            if sum(d['value'] for d in trade_sell) > 0:
                 # Sell brackets currently range from 0 - 3
                 text += cyan(__("TrdProfit", lang), fp=fp) + " "
-                if int(trade_sell[0]['profit']) != 0: text += f"{'🆉' if discord else '[Z]'}:{green(human_format(trade_sell[0]['profit']), fp=fp)} "
-                if int(trade_sell[1]['profit']) != 0: text += f"{'🅻' if discord else '[L]'}:{green(human_format(trade_sell[1]['profit']), fp=fp)} "
-                if int(trade_sell[2]['profit']) != 0: text += f"{'🅼' if discord else '[M]'}:{green(human_format(trade_sell[2]['profit']), fp=fp)} "
-                if int(trade_sell[3]['profit']) != 0: text += f"{'🅷' if discord else '[H]'}:{green(human_format(trade_sell[3]['profit']), fp=fp)} "
+                if trade_sell[0]['profit'] != 0: text += f"{'🆉' if discord else '[Z]'}:{green(human_format(trade_sell[0]['profit']), fp=fp)} "
+                if trade_sell[1]['profit'] != 0: text += f"{'🅻' if discord else '[L]'}:{green(human_format(trade_sell[1]['profit']), fp=fp)} "
+                if trade_sell[2]['profit'] != 0: text += f"{'🅼' if discord else '[M]'}:{green(human_format(trade_sell[2]['profit']), fp=fp)} "
+                if trade_sell[3]['profit'] != 0: text += f"{'🅷' if discord else '[H]'}:{green(human_format(trade_sell[3]['profit']), fp=fp)} "
 
         return text
 
@@ -417,15 +417,15 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
         # Force plain text if we are not posting to Discord
         fp: bool = not discord
 
-        if 'l' in cz_data and cz_data['l'] != "" and int(cz_data['l']) != 0: text += f"L x {green(cz_data['l'], fp=fp)} "
-        if 'm' in cz_data and cz_data['m'] != "" and int(cz_data['m']) != 0: text += f"M x {green(cz_data['m'], fp=fp)} "
-        if 'h' in cz_data and cz_data['h'] != "" and int(cz_data['h']) != 0: text += f"H x {green(cz_data['h'], fp=fp)} "
+        if cz_data.get('l', 0) != 0: text += f"L x {green(cz_data['l'], fp=fp)} "
+        if cz_data.get('m', 0) != 0: text += f"M x {green(cz_data['m'], fp=fp)} "
+        if cz_data.get('h', 0) != 0: text += f"H x {green(cz_data['h'], fp=fp)} "
 
         objectives: str = ""
-        if 'cs' in cz_data and cz_data['cs'] != "" and int(cz_data['cs']) != 0: objectives += f"{'👑' if discord else 'Cap Ship'}:{green(cz_data['cs'], fp=fp)} " # Cap Ship
-        if 'so' in cz_data and cz_data['so'] != "" and int(cz_data['so']) != 0: objectives += f"{'🔠' if discord else 'Spec Ops'}:{green(cz_data['so'], fp=fp)} " # Spec Ops
-        if 'cp' in cz_data and cz_data['cp'] != "" and int(cz_data['cp']) != 0: objectives += f"{'👨‍✈️' if discord else 'Capt'}:{green(cz_data['cp'], fp=fp)} " # Captain
-        if 'pr' in cz_data and cz_data['pr'] != "" and int(cz_data['pr']) != 0: objectives += f"{'✒️' if discord else 'Propagand'}:{green(cz_data['pr'], fp=fp)} " # Propagandist
+        if cz_data.get('cs', 0) != 0: objectives += f"{'👑' if discord else 'Cap Ship'}:{green(cz_data['cs'], fp=fp)} " # Cap Ship
+        if cz_data.get('so', 0) != 0: objectives += f"{'🔠' if discord else 'Spec Ops'}:{green(cz_data['so'], fp=fp)} " # Spec Ops
+        if cz_data.get('cp', 0) != 0: objectives += f"{'👨‍✈️' if discord else 'Capt'}:{green(cz_data['cp'], fp=fp)} " # Captain
+        if cz_data.get('pr', 0) != 0: objectives += f"{'✒️' if discord else 'Propagand'}:{green(cz_data['pr'], fp=fp)} " # Propagandist
         if objectives != "": text += f"({objectives.rstrip()}) "
 
         if text != "": text = f"{red(prefix, fp=fp)} {text} "
@@ -458,8 +458,8 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
             elif k == 'sg': label = "S/G" # Scythe / Glaive
             else: label = k.upper()       # All others
 
-            if isinstance(v, dict): value = int(v.get('sum', 0))
-            else: value = int(v)
+            if isinstance(v, dict): value = v.get('sum', 0)
+            else: value = v
             if value == 0: continue
 
             if not first: text += ", "
@@ -485,7 +485,7 @@ class DefaultActivityFormatter(FieldActivityFormatterInterface):
         # Force plain text if we are not posting to Discord
         fp: bool = not discord
 
-        value: int = int(sum(sandr_data.values()))
+        value: int = sum(sandr_data.values())
         if value == 0: return ""
 
         return white(__("SandR", lang), fp=fp) + " " + green(value, fp=fp) + " " # LANG: Discord heading, abbreviation for search and rescue
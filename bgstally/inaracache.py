@@ -0,0 +1,99 @@
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from os import path
+
+from bgstally.constants import DATETIME_FORMAT_JOURNAL, FOLDER_OTHER_DATA
+from bgstally.debug import Debug
+from bgstally.savemanager import FileWrite
+
+FILENAME = "inaracache.json"
+
+
+class InaraCache:
+    """
+    An on-disk cache of CMDR profiles fetched from Inara. Profiles expire after a time limit, and the least recently used
+    profiles are discarded when the cache is full.
+    """
+    def __init__(self, bgstally):
+        self.bgstally = bgstally
+        self.ttl: timedelta = timedelta(days = self.bgstally.config.inara_cache_ttl_days())
+        self.max_size: int = self.bgstally.config.inara_cache_max_size()
+
+        # key = CMDR name, value = dict containing the time the profile was fetched and the profile. Least recently used first.
+        self.profiles: OrderedDict = OrderedDict()
+        self.dirty: bool = False
+        self.load()
+
+
+    def load(self):
+        """
+        Load cached profiles from file, dropping any that have expired
+        """
+        file:str = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
+        if not path.exists(file): return
+
+        try:
+            with open(file) as json_file:
+                profiles:dict = json.load(json_file)
+        except Exception as e:
+            Debug.logger.info(f"Unable to load {file}")
+            return
+
+        now:datetime = datetime.utcnow()
+        for cmdr_name, entry in profiles.items():
+            if now - datetime.strptime(entry['timestamp'], DATETIME_FORMAT_JOURNAL) < self.ttl:
+                self.profiles[cmdr_name] = entry
+            else:
+                self.dirty = True
+
+        self._evict()
+
+
+    def prepare_save(self) -> list[FileWrite]:
+        """
+        Prepare cached profiles to be saved to file, if they have changed
+        """
+        if not self.dirty: return []
+
+        file:str = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
+        text:str = json.dumps(self.profiles, separators=(',', ':'))
+        self.dirty = False
+        return [FileWrite(file, text)]
+
+
+    def get(self, cmdr_name:str) -> dict|None:
+        """
+        Get the cached Inara profile for a CMDR, or None if there is no current profile. An empty profile means the
+        CMDR was not found on Inara.
+        """
+        entry:dict|None = self.profiles.get(cmdr_name)
+        if entry is None: return None
+
+        if datetime.utcnow() - datetime.strptime(entry['timestamp'], DATETIME_FORMAT_JOURNAL) >= self.ttl:
+            del self.profiles[cmdr_name]
+            self.dirty = True
+            return None
+
+        # The new order is saved the next time the cache changes
+        self.profiles.move_to_end(cmdr_name)
+        return entry['profile']
+
+
+    def put(self, cmdr_name:str, profile:dict):
+        """
+        Cache the Inara profile for a CMDR
+        """
+        self.profiles[cmdr_name] = {'timestamp': datetime.utcnow().strftime(DATETIME_FORMAT_JOURNAL), 'profile': profile}
+        self.profiles.move_to_end(cmdr_name)
+        self._evict()
+        self.dirty = True
+
+
+    def _evict(self):
+        """
+        Discard the least recently used profiles until the cache is within its maximum size
+        """
+        while len(self.profiles) > self.max_size:
+            self.profiles.popitem(last=False)
+            self.dirty = True
@@ -1,9 +1,11 @@
+import heapq
 import json
 from os import path, remove
 from datetime import datetime, timedelta
 
 from bgstally.constants import DATETIME_FORMAT_JOURNAL, FOLDER_OTHER_DATA
 from bgstally.debug import Debug
+from bgstally.savemanager import FileWrite
 
 FILENAME = "missionlog.json"
 FILENAME_LEGACY = "MissionLog.txt"
@@ -16,9 +18,15 @@ class MissionLog:
     """
     def __init__(self, bgstally):
         self.bgstally = bgstally
-        self.missionlog = []
+        # All in-progress missions. key = MissionID, value = mission dict. Stored on disk as a list of the mission dicts.
+        self.missions: dict = {}
+        # Count of in-progress missions per system. key = system name, value = number of missions
+        self.system_counts: dict[str, int] = {}
+        # Min-heap of (time to remove mission, MissionID). Entries for missions that have already been removed are skipped when popped.
+        self.expiry_heap: list[tuple] = []
+        self.dirty: bool = False
         self.load()
-        self._expire_old_missions()
+        self.expire_old_missions()
 
 
     def load(self):
@@ -30,7 +38,7 @@ class MissionLog:
         if path.exists(file):
             try:
                 with open(file) as json_file:
-                    self.missionlog = json.load(json_file)
+                    self._set_missions(json.load(json_file))
                     return
             except Exception as e:
                 Debug.logger.info(f"Unable to load {file}")
@@ -40,26 +48,30 @@ class MissionLog:
         if path.exists(file):
             try:
                 with open(file) as json_file:
-                    self.missionlog = json.load(json_file)
+                    self._set_missions(json.load(json_file))
                 remove(file)
+                self.dirty = True
             except Exception as e:
                 Debug.logger.info(f"Unable to load and remove {file}")
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save state to file
+        Prepare state to be saved to file, if it has changed
         """
+        if not self.dirty: return []
+
         file = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
-        with open(file, 'w') as outfile:
-            json.dump(self.missionlog, outfile)
+        text:str = json.dumps(list(self.missions.values()), separators=(',', ':'))
+        self.dirty = False
+        return [FileWrite(file, text)]
 
 
     def get_missionlog(self):
         """
-        Get the current missionlog
+        Get the current missionlog, as a list of missions
         """
-        return self.missionlog
+        return list(self.missions.values())
 
 
     def get_mission(self, missionid: int):
@@ -67,10 +79,7 @@ class MissionLog:
         Fetch a given mission from the missionlog, or None if not found
         """
         if missionid is None: return None
-
-        for mission in self.missionlog:
-            if mission['MissionID'] == missionid: return mission
-        return None
+        return self.missions.get(missionid)
 
 
     def add_mission(self, name: str, faction: str, missionid: str, expiry: str,
@@ -80,47 +89,115 @@ class MissionLog:
         """
         Add a mission to the missionlog
         """
-        self.missionlog.append({'Name': name, 'Faction': faction, 'MissionID': missionid, 'Expiry': expiry,
+        self._add_mission({'Name': name, 'Faction': faction, 'MissionID': missionid, 'Expiry': expiry,
                                 'DestinationSystem': destination_system, 'DestinationSettlement': destination_settlement, 'System': system_name, 'Station': station_name,
                                 'CommodityCount': commodity_count, 'PassengerCount': passenger_count, 'KillCount': kill_count,
                                 'TargetFaction': target_faction})
+        self.dirty = True
 
 
     def delete_mission_by_id(self, missionid: str):
         """
         Delete the mission with the given id from the missionlog
         """
-        for i in range(len(self.missionlog)):
-            if self.missionlog[i]['MissionID'] == missionid:
-                self.missionlog.pop(i)
-                break
+        if self._remove_mission(missionid) is not None: self.dirty = True
 
 
     def delete_mission_by_index(self, missionindex: int):
         """
         Delete the mission at the given index from the missionlog
         """
-        self.missionlog.pop(missionindex)
+        missionid = list(self.missions.keys())[missionindex]
+        self._remove_mission(missionid)
+        self.dirty = True
 
 
     def get_active_systems(self):
         """
         Return a list of systems that have currently active missions
         """
-        systems = [x['System'] for x in self.missionlog]
-        # De-dupe before returning
-        return list(dict.fromkeys(systems))
+        return list(self.system_counts.keys())
+
+
+    def expire_old_missions(self) -> bool:
+        """
+        Clear out all missions that expired more than 7 days ago from the mission log. Keep missions for a while after they
+        have expired, so we can log failed missions correctly. Returns True if any missions were removed.
+        """
+        now:datetime = datetime.utcnow()
+        removed:bool = False
+
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, missionid = heapq.heappop(self.expiry_heap)
+            mission:dict|None = self.missions.get(missionid)
 
+            # Skip stale entries, for missions that have already been removed or replaced by a later mission with the same ID
+            if mission is None or self._get_removal_time(mission) > now: continue
 
-    def _expire_old_missions(self):
+            self._remove_mission(missionid)
+            removed = True
+
+        # Drop heap entries for missions that were completed, failed or abandoned before they expired
+        if len(self.expiry_heap) > 2 * len(self.missions):
+            self.expiry_heap = [(self._get_removal_time(mission), missionid) for missionid, mission in self.missions.items()]
+            heapq.heapify(self.expiry_heap)
+
+        if removed: self.dirty = True
+        return removed
+
+
+    def _get_removal_time(self, mission: dict) -> datetime:
         """
-        Clear out all missions older than 7 days from the mission log
+        Get the time a mission should be removed from the mission log
+        """
+        return datetime.strptime(mission['Expiry'], DATETIME_FORMAT_JOURNAL) + timedelta(days = TIME_MISSION_EXPIRY_D)
+
+
+    def _set_missions(self, missionlog: list):
         """
-        for mission in reversed(self.missionlog):
-            # Old missions pre v1.11.0 and missions with missing expiry dates don't have Expiry stored. Set to 7 days ahead for safety
-            if not 'Expiry' in mission or mission['Expiry'] == "": mission['Expiry'] = (datetime.utcnow() + timedelta(days = TIME_MISSION_EXPIRY_D)).strftime(DATETIME_FORMAT_JOURNAL)
+        Replace all missions with those in the given list, as stored on disk
+        """
+        self.missions = {}
+        self.system_counts = {}
+        self.expiry_heap = []
+
+        for mission in missionlog:
+            if mission.get('MissionID') in self.missions:
+                # Duplicate mission, keep the first one
+                self.dirty = True
+                continue
+            self._add_mission(mission)
+
+
+    def _add_mission(self, mission: dict):
+        """
+        Add a mission, maintaining the per-system mission counts. A mission with the same MissionID is replaced.
+        """
+        # Old missions pre v1.11.0 and missions with missing expiry dates don't have Expiry stored. Set to 7 days ahead for safety
+        if not 'Expiry' in mission or mission['Expiry'] == "":
+            mission['Expiry'] = (datetime.utcnow() + timedelta(days = TIME_MISSION_EXPIRY_D)).strftime(DATETIME_FORMAT_JOURNAL)
+            self.dirty = True
+
+        self._remove_mission(mission.get('MissionID'))
+        self.missions[mission.get('MissionID')] = mission
+        system_name: str = mission.get('System')
+        self.system_counts[system_name] = self.system_counts.get(system_name, 0) + 1
+
+        heapq.heappush(self.expiry_heap, (self._get_removal_time(mission), mission.get('MissionID')))
+
+
+    def _remove_mission(self, missionid) -> dict|None:
+        """
+        Remove a mission, maintaining the per-system mission counts. Returns the removed mission or None if not found.
+        """
+        mission: dict|None = self.missions.pop(missionid, None)
+        if mission is None: return None
+
+        system_name: str = mission.get('System')
+        count: int = self.system_counts.get(system_name, 0) - 1
+        if count > 0:
+            self.system_counts[system_name] = count
+        else:
+            self.system_counts.pop(system_name, None)
 
-            timedifference = datetime.utcnow() - datetime.strptime(mission['Expiry'], DATETIME_FORMAT_JOURNAL)
-            if timedifference > timedelta(days = TIME_MISSION_EXPIRY_D):
-                # Keep missions for a while after they have expired, so we can log failed missions correctly
-                self.missionlog.remove(mission)
+        return mission
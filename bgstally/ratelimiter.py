@@ -0,0 +1,189 @@
+from time import monotonic, time
+from urllib.parse import urlsplit
+
+from requests import Response
+
+from bgstally.debug import Debug
+
+# Default rate for routes the server hasn't given us rate limit information for
+DEFAULT_CAPACITY = 1
+DEFAULT_REFILL_PER_S = 1.0
+
+HEADER_BUCKET = "X-RateLimit-Bucket"
+HEADER_GLOBAL = "X-RateLimit-Global"
+HEADER_LIMIT = "X-RateLimit-Limit"
+HEADER_REMAINING = "X-RateLimit-Remaining"
+HEADER_RESET = "X-RateLimit-Reset"
+HEADER_RESET_AFTER = "X-RateLimit-Reset-After"
+HEADER_RETRY_AFTER = "Retry-After"
+HEADER_SCOPE = "X-RateLimit-Scope"
+
+STATUS_TOO_MANY_REQUESTS = 429
+
+
+class RateLimitBucket:
+    """
+    A token bucket limiting the rate of requests on a route. By default it refills steadily, but when the server tells
+    us its own limits the bucket follows them instead, allowing bursts up to the server's remaining allowance.
+    """
+    def __init__(self):
+        self.capacity:float = DEFAULT_CAPACITY
+        self.refill_per_s:float = DEFAULT_REFILL_PER_S
+        self.tokens:float = DEFAULT_CAPACITY
+        self.updated:float = monotonic()
+        # Monotonic time at which the server's rate limit window resets and the bucket is refilled, or None if unknown
+        self.reset_at:float|None = None
+        # Monotonic time before which no requests may be made, as instructed by the server
+        self.blocked_until:float = 0
+
+
+    def get_delay(self) -> float:
+        """
+        Get the number of seconds to wait before a request can be made
+        """
+        self._refill()
+        delay:float = max(0, self.blocked_until - monotonic())
+
+        if self.tokens < 1:
+            if self.reset_at is not None:
+                delay = max(delay, self.reset_at - monotonic())
+            else:
+                delay = max(delay, (1 - self.tokens) / self.refill_per_s)
+
+        return delay
+
+
+    def take(self):
+        """
+        A request has been made, use a token
+        """
+        self._refill()
+        self.tokens -= 1
+
+
+    def update(self, limit:float|None, remaining:float|None, reset_after:float|None):
+        """
+        Update the bucket from the rate limit information given by the server
+        """
+        if limit is not None and limit > 0: self.capacity = limit
+        if remaining is not None: self.tokens = min(self.capacity, remaining)
+        if reset_after is not None: self.reset_at = monotonic() + reset_after
+
+
+    def block(self, retry_after:float):
+        """
+        The server has rejected a request, block all requests for the given number of seconds
+        """
+        self.blocked_until = max(self.blocked_until, monotonic() + retry_after)
+        self.tokens = min(self.tokens, 0)
+
+
+    def _refill(self):
+        """
+        Top up the tokens for the time that has passed
+        """
+        now:float = monotonic()
+
+        if self.reset_at is not None:
+            # The server's window has reset, so we have its full allowance again
+            if now >= self.reset_at:
+                self.tokens = self.capacity
+                self.reset_at = None
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_s)
+
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Limits the rate of requests to a single host, with a token bucket per route. Rate limit headers returned by the
+    server (as used by Discord and others) are honoured, including Retry-After when we are rate limited. Not thread safe,
+    each host's worker has its own limiter.
+    """
+    def __init__(self, host:str):
+        self.host:str = host
+        # key = route or server-provided bucket ID, value = RateLimitBucket
+        self.buckets:dict[str, RateLimitBucket] = {}
+        # key = route, value = the server-provided bucket ID for the route. Several routes may share a bucket.
+        self.route_buckets:dict[str, str] = {}
+        # Monotonic time before which no requests may be made to this host at all
+        self.blocked_until:float = 0
+
+
+    def get_route(self, url:str) -> str:
+        """
+        Get the route for a URL. Requests to the same resource share a route, ignoring any query and trailing numeric ID
+        (e.g. a Discord webhook message ID)
+        """
+        segments:list = urlsplit(url).path.rstrip("/").split("/")
+        if len(segments) > 1 and segments[-1].isdigit(): segments = segments[:-1]
+        return "/".join(segments)
+
+
+    def get_delay(self, route:str) -> float:
+        """
+        Get the number of seconds to wait before a request can be made on a route
+        """
+        return max(self.blocked_until - monotonic(), self._get_bucket(route).get_delay())
+
+
+    def request_sent(self, route:str):
+        """
+        A request has been sent on a route
+        """
+        self._get_bucket(route).take()
+
+
+    def response_received(self, route:str, response:Response):
+        """
+        A response has been received on a route, update our limits from its headers
+        """
+        headers = response.headers
+
+        bucket_id:str|None = headers.get(HEADER_BUCKET)
+        if bucket_id is not None and self.route_buckets.get(route) != bucket_id:
+            # Adopt the server's bucket, which may be shared with other routes
+            self.route_buckets[route] = bucket_id
+            self.buckets.setdefault(bucket_id, self.buckets.pop(route, RateLimitBucket()))
+
+        bucket:RateLimitBucket = self._get_bucket(route)
+
+        reset_after:float|None = self._get_float(headers, HEADER_RESET_AFTER)
+        if reset_after is None:
+            reset:float|None = self._get_float(headers, HEADER_RESET)
+            if reset is not None: reset_after = max(0, reset - time())
+
+        bucket.update(self._get_float(headers, HEADER_LIMIT), self._get_float(headers, HEADER_REMAINING), reset_after)
+
+        if response.status_code == STATUS_TOO_MANY_REQUESTS:
+            retry_after:float = self._get_float(headers, HEADER_RETRY_AFTER) or reset_after or 1 / DEFAULT_REFILL_PER_S
+            Debug.logger.info(f"Rate limited by {self.host}, waiting {retry_after}s")
+
+            if headers.get(HEADER_GLOBAL, "").lower() == "true" or headers.get(HEADER_SCOPE) == "global":
+                self.blocked_until = max(self.blocked_until, monotonic() + retry_after)
+            else:
+                bucket.block(retry_after)
+
+
+    def _get_bucket(self, route:str) -> RateLimitBucket:
+        """
+        Get the bucket for a route, creating it if needed
+        """
+        key:str = self.route_buckets.get(route, route)
+        bucket:RateLimitBucket|None = self.buckets.get(key)
+        if bucket is None:
+            bucket = RateLimitBucket()
+            self.buckets[key] = bucket
+
+        return bucket
+
+
+    def _get_float(self, headers, name:str) -> float|None:
+        """
+        Get a numeric header value, or None if it's missing or not a number
+        """
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            return None
@@ -1,29 +1,90 @@
-from queue import Queue
+import heapq
+from itertools import count
+from queue import PriorityQueue
+from random import uniform
 from re import IGNORECASE, compile, match
-from threading import Thread
-from time import sleep
+from threading import Condition, Lock, Thread
+from time import monotonic, sleep
+from urllib.parse import urlsplit
 
 import requests
 from requests import Response
 
-from bgstally.constants import RequestMethod
+from bgstally.constants import RequestMethod, RequestPriority
 from bgstally.debug import Debug
+from bgstally.ratelimiter import STATUS_TOO_MANY_REQUESTS, RateLimiter
 from config import config
 
-TIME_WORKER_PERIOD_S = 1
 TIMEOUT_S = 10
+RATE_LIMITED_MAX_RETRIES = 3
+
+# Methods that can safely be repeated, because repeating them has the same effect as making them once
+IDEMPOTENT_METHODS = {RequestMethod.GET, RequestMethod.PUT, RequestMethod.PATCH, RequestMethod.DELETE, RequestMethod.HEAD, RequestMethod.OPTIONS}
+# HTTP statuses worth retrying, as the problem is likely to be temporary
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+# HTTP statuses which mean the server didn't process the request, so even non-idempotent requests can be retried
+RETRY_STATUSES_UNPROCESSED = {429, 502, 503, 504}
+
+
+class RetryPolicy:
+    """
+    Determines whether and when a failed request is retried. Delays increase exponentially with each attempt, with
+    random jitter so that many failed requests don't all retry at once.
+    """
+    def __init__(self, max_attempts:int = 3, backoff_s:float = 2, max_backoff_s:float = 60, idempotent:bool|None = None):
+        # The maximum number of times to send the request, including the first attempt
+        self.max_attempts:int = max_attempts
+        # The delay before the first retry, doubling for each subsequent retry
+        self.backoff_s:float = backoff_s
+        # The maximum delay between retries
+        self.max_backoff_s:float = max_backoff_s
+        # True if the request is safe to repeat, False if not, None to decide from the request method
+        self.idempotent:bool|None = idempotent
+
+
+    def should_retry(self, request:'BGSTallyRequest', response:Response|None, exception:Exception) -> bool:
+        """
+        Return True if a failed request should be retried
+        """
+        if request.attempts >= self.max_attempts: return False
+
+        idempotent:bool = request.method in IDEMPOTENT_METHODS if self.idempotent is None else self.idempotent
+
+        if isinstance(exception, requests.exceptions.HTTPError) and response is not None:
+            # The server responded with an error
+            return response.status_code in (RETRY_STATUSES if idempotent else RETRY_STATUSES_UNPROCESSED)
+        elif isinstance(exception, requests.exceptions.ConnectionError):
+            # We couldn't connect, so the request wasn't processed. A read timeout is not a ConnectionError.
+            return True
+        elif isinstance(exception, requests.exceptions.Timeout):
+            # The server may have processed the request before timing out
+            return idempotent
+        else:
+            return False
+
+
+    def get_delay(self, attempts:int) -> float:
+        """
+        Get the delay before the next retry, after the given number of attempts
+        """
+        delay:float = min(self.max_backoff_s, self.backoff_s * (2 ** (attempts - 1)))
+        return uniform(delay / 2, delay)
+
+
+RETRY_POLICY_DEFAULT = RetryPolicy()
+RETRY_POLICY_NONE = RetryPolicy(max_attempts=1)
 
 
 class BGSTallyRequest:
     """
     Encapsulates a request that can be queued and processed in a thread
     """
-    def __init__(self, endpoint:str, method:RequestMethod, callback:callable, params:dict, headers:dict, stream:bool, payload:dict|None, data:dict|None):
+    def __init__(self, endpoint:str, method:RequestMethod, callback:callable, params:dict, headers:dict, stream:bool, payload:dict|None, data:dict|None, retry_policy:RetryPolicy = RETRY_POLICY_DEFAULT, priority:RequestPriority = RequestPriority.NORMAL):
         # The endpoint to call
         self.endpoint:str = endpoint
         # The type of request
         self.method:RequestMethod = method
-        # A callback function to call when the response is received
+        # A callback function to call when the response is received. Called on the request thread for the endpoint's host.
         self.callback:callable = callback
         # Request parameters
         self.params:dict = params
@@ -35,6 +96,12 @@ class BGSTallyRequest:
         self.payload:dict|None = payload
         # Any additional data required to be passed to the callback function when the response is received
         self.data:dict|None = data
+        # Whether and when to retry the request if it fails
+        self.retry_policy:RetryPolicy = retry_policy
+        # Requests with higher priority (lower value) are sent before other queued requests to the same host
+        self.priority:RequestPriority = priority
+        # The number of times the request has been sent
+        self.attempts:int = 0
 
     def __str__(self):
         """
@@ -47,12 +114,15 @@ class BGSTallyRequest:
                     f"  headers: {self.headers} \n" \
                     f"  stream: {self.stream} \n" \
                     f"  payload: {self.payload} \n" \
-                    f"  data: {self.data} \n"
+                    f"  data: {self.data} \n" \
+                    f"  attempts: {self.attempts} \n" \
+                    f"  priority: {self.priority} \n"
 
 
 class RequestManager:
     """
-    Handles the queuing and processing of requests
+    Handles the queuing and processing of requests. Requests are queued per host, and each host has its own worker thread
+    and keep-alive session, so a slow host doesn't hold up requests to other hosts.
     """
     def __init__(self, bgstally):
         self.bgstally = bgstally
@@ -63,16 +133,34 @@ class RequestManager:
             r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})' # ...or ip
             r'(?::\d+)?' # optional port
             r'(?:/?|[/?]\S+)$', IGNORECASE)
-        self.request_queue:Queue = Queue()
+        # key = host, value = priority queue of (priority, sequence number, request) for that host. The sequence number
+        # keeps requests of the same priority in the order they were queued.
+        self.request_queues:dict[str, PriorityQueue] = {}
+        self.request_sequence:count = count()
+        # key = host, value = worker thread for that host
+        self.request_threads:dict[str, Thread] = {}
+        # Held while creating queues and workers for new hosts
+        self.lock:Lock = Lock()
+
+        # Min-heap of (monotonic time due, sequence number, request) for failed requests waiting to be retried
+        self.retry_heap:list[tuple] = []
+        self.retry_sequence:int = 0
+        self.retry_condition:Condition = Condition()
 
-        self.request_thread: Thread = Thread(target=self._worker, name="BGSTally Request worker")
-        self.request_thread.daemon = True
-        self.request_thread.start()
+        self.retry_thread:Thread = Thread(target=self._retry_worker, name="BGSTally Request retry worker")
+        self.retry_thread.daemon = True
+        self.retry_thread.start()
 
 
-    def queue_request(self, endpoint:str, method:RequestMethod, callback:callable = None, params:dict = {}, headers:dict = {}, stream:bool = False, payload:dict|None = None, data:dict|None = None):
+    def queue_request(self, endpoint:str, method:RequestMethod, callback:callable = None, params:dict = {}, headers:dict = {}, stream:bool = False, payload:dict|None = None, data:dict|None = None, retry_policy:RetryPolicy = RETRY_POLICY_DEFAULT, priority:RequestPriority = RequestPriority.NORMAL):
         """
-        Add a request to the queue
+        Add a request to the queue. Requests the user is waiting for should be queued with INTERACTIVE priority, so they
+        are sent ahead of any backlog. Failed requests are retried according to the retry policy, and the callback is only
+        called once the request succeeds or will not be retried.
+
+        The callback is called on the request thread for the endpoint's host, so callbacks for requests to different hosts
+        can run at the same time as each other and as the main thread. Callbacks that change plugin data must hold the
+        save manager lock while doing so.
         """
         if not self.url_valid(endpoint):
             Debug.logger.info(f"Attempted to call {endpoint} which is not a well-formed URL")
@@ -80,7 +168,7 @@ class RequestManager:
 
         headers:dict = {'User-Agent': f"{self.bgstally.plugin_name}/{self.bgstally.version}"} | headers
 
-        self.request_queue.put(BGSTallyRequest(endpoint, method, callback, params, headers, stream, payload, data))
+        self._put_request(BGSTallyRequest(endpoint, method, callback, params, headers, stream, payload, data, retry_policy, priority))
 
 
     def url_valid(self, url:str) -> bool:
@@ -91,50 +179,140 @@ class RequestManager:
         return match(self.re_url, url) is not None
 
 
-    def _worker(self) -> None:
+    def _put_request(self, request:BGSTallyRequest):
+        """
+        Put a request on its host's queue
+        """
+        self._get_request_queue(urlsplit(request.endpoint).netloc.lower()).put((request.priority.value, next(self.request_sequence), request))
+
+
+    def _get_request_queue(self, host:str) -> PriorityQueue:
+        """
+        Get the request queue for a host, starting a worker for the host if this is the first request to it
+        """
+        with self.lock:
+            request_queue:PriorityQueue|None = self.request_queues.get(host)
+            if request_queue is not None: return request_queue
+
+            request_queue = PriorityQueue()
+            self.request_queues[host] = request_queue
+
+            request_thread:Thread = Thread(target=self._worker, args=(host, request_queue), name=f"BGSTally Request worker ({host})")
+            request_thread.daemon = True
+            request_thread.start()
+            self.request_threads[host] = request_thread
+
+            return request_queue
+
+
+    def _worker(self, host:str, request_queue:PriorityQueue) -> None:
         """
-        Handle request thread work
+        Handle request thread work for a single host
         """
-        Debug.logger.debug("Starting Request Worker...")
+        Debug.logger.debug(f"Starting Request Worker ({host})...")
+
+        # A session keeps connections to the host alive between requests, avoiding a new TLS handshake for each request
+        session:requests.Session = requests.Session()
+        rate_limiter:RateLimiter = RateLimiter(host)
 
         while True:
             if config.shutting_down:
-                Debug.logger.debug("Shutting down RequestManager Worker...")
+                Debug.logger.debug(f"Shutting down RequestManager Worker ({host})...")
+                session.close()
                 return
 
-            sleep(TIME_WORKER_PERIOD_S)
-
-            # Fetch from the queue. Blocks indefinitely until an item is available.
-            request:BGSTallyRequest = self.request_queue.get()
+            # Fetch the highest priority request from the queue. Blocks indefinitely until an item is available.
+            _, _, request = request_queue.get()
 
             if not isinstance(request, BGSTallyRequest):
                 Debug.logger.error(f"Queued request was not an instance of BGSTallyRequest")
                 continue
 
-            Debug.logger.info(f"Processing {request.method} request {request.endpoint}")
+            if not isinstance(request.method, RequestMethod):
+                Debug.logger.warning(f"Invalid request method {request.method}")
+                self._call_callback(request, False, None)
+                continue
 
+            route:str = rate_limiter.get_route(request.endpoint)
             response:Response = None
+            retries:int = 0
+            request.attempts += 1
+
             try:
-                match request.method:
-                    case RequestMethod.GET: response = requests.get(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, timeout=TIMEOUT_S)
-                    case RequestMethod.POST: response = requests.post(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, json=request.payload, timeout=TIMEOUT_S)
-                    case RequestMethod.PUT: response = requests.put(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, json=request.payload, timeout=TIMEOUT_S)
-                    case RequestMethod.PATCH: response = requests.patch(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, json=request.payload, timeout=TIMEOUT_S)
-                    case RequestMethod.DELETE: response = requests.delete(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, timeout=TIMEOUT_S)
-                    case RequestMethod.HEAD: response = requests.head(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, timeout=TIMEOUT_S)
-                    case RequestMethod.OPTIONS: response = requests.options(request.endpoint, params=request.params, headers=request.headers, stream=request.stream, timeout=TIMEOUT_S)
-                    case _:
-                        Debug.logger.warning(f"Invalid request method {request.type}")
-                        if request.callback: request.callback(False, response, request)
+                while True:
+                    # Wait until the rate limit for this route allows another request
+                    delay:float = rate_limiter.get_delay(route)
+                    if delay > 0: sleep(delay)
+
+                    Debug.logger.info(f"Processing {request.method} request {request.endpoint}")
+                    rate_limiter.request_sent(route)
+                    response = session.request(request.method.value, request.endpoint, params=request.params, headers=request.headers, stream=request.stream, json=request.payload, timeout=TIMEOUT_S)
+                    rate_limiter.response_received(route, response)
+
+                    # If we were rate limited, send again once the server allows it
+                    if response.status_code == STATUS_TOO_MANY_REQUESTS and retries < RATE_LIMITED_MAX_RETRIES:
+                        retries += 1
                         continue
 
+                    break
+
                 response.raise_for_status()
 
             except requests.exceptions.RequestException as e:
+                if request.retry_policy.should_retry(request, response, e):
+                    delay:float = request.retry_policy.get_delay(request.attempts)
+                    Debug.logger.info(f"Request failure {request.endpoint}: {str(e)}, retrying in {delay:.1f}s")
+                    self._schedule_retry(request, delay)
+                    continue
+
                 Debug.logger.info(f"Request failure {request.endpoint}: {str(e)}")
-                if request.callback: request.callback(False, response, request)
+                self._call_callback(request, False, response)
 
             else:
                 # Success
                 Debug.logger.info(f"Request success {request.endpoint}")
-                if request.callback: request.callback(True, response, request)
+                self._call_callback(request, True, response)
+
+
+    def _call_callback(self, request:BGSTallyRequest, success:bool, response:Response|None):
+        """
+        Call a request's callback, if it has one. Errors in the callback are logged rather than stopping the worker, as
+        that would leave all further requests to the host unsent.
+        """
+        if not request.callback: return
+
+        try:
+            request.callback(success, response, request)
+        except Exception as e:
+            Debug.logger.error(f"Error in callback for {request.method} request {request.endpoint}", exc_info=e)
+
+
+    def _schedule_retry(self, request:BGSTallyRequest, delay:float):
+        """
+        Schedule a failed request to be queued again after a delay, without holding up other requests
+        """
+        with self.retry_condition:
+            heapq.heappush(self.retry_heap, (monotonic() + delay, self.retry_sequence, request))
+            self.retry_sequence += 1
+            self.retry_condition.notify()
+
+
+    def _retry_worker(self) -> None:
+        """
+        Handle retry thread work. Re-queues failed requests on their host's queue when their retry delay has passed.
+        """
+        Debug.logger.debug("Starting Request Retry Worker...")
+
+        while True:
+            with self.retry_condition:
+                # Blocks until a retry is scheduled or the next retry is due
+                while not self.retry_heap or self.retry_heap[0][0] > monotonic():
+                    if config.shutting_down:
+                        Debug.logger.debug("Shutting down Request Retry Worker...")
+                        return
+
+                    self.retry_condition.wait(self.retry_heap[0][0] - monotonic() if self.retry_heap else None)
+
+                _, _, request = heapq.heappop(self.retry_heap)
+
+            self._put_request(request)
@@ -0,0 +1,143 @@
+from os import fsync, path, remove
+from threading import Event, Lock, RLock, Thread
+from time import sleep
+
+from bgstally.debug import Debug
+from bgstally.utils import write_text_atomic
+from config import config
+
+TIME_SAVE_DEBOUNCE_S = 5
+
+
+class FileWrite:
+    """
+    A change to a data file, prepared while holding the save lock and written to disk after it has been released
+    """
+    def __init__(self, filepath: str, text: str|None, append: bool = False):
+        self.filepath: str = filepath
+        # The new contents of the file, the text to append to it, or None to delete it
+        self.text: str|None = text
+        self.append: bool = append
+
+
+    def write(self):
+        """
+        Make the change on disk
+        """
+        if self.text is None:
+            if path.exists(self.filepath): remove(self.filepath)
+        elif self.append:
+            with open(self.filepath, 'a', encoding='utf-8') as outfile:
+                outfile.write(self.text)
+                outfile.flush()
+                fsync(outfile.fileno())
+        else:
+            write_text_atomic(self.filepath, self.text)
+
+
+class SaveManager:
+    """
+    Handles saving of persistent data stores in a background thread. Bursts of save requests (e.g. many journal events in
+    quick succession) are coalesced into a single save per debounce window.
+
+    Each store has a prepare_save() method, called while holding the lock, that returns a list of FileWrites for the data
+    that has changed since it was last prepared. The writes are made after releasing the lock, so journal events are
+    never held up waiting for the disk.
+    """
+    def __init__(self, bgstally, stores: list):
+        self.bgstally = bgstally
+
+        # The stores we are responsible for saving
+        self.stores: list = stores
+
+        # Held while stores are preparing their changes. Hold it while mutating store data from other threads to avoid saving part-modified data.
+        self.lock: RLock = RLock()
+        # Held while preparing and writing changes, so they reach the disk in the order they were prepared. Always taken
+        # before lock, never while holding it.
+        self.write_lock: Lock = Lock()
+        # Writes that failed, as (store, FileWrite), to be tried again before any newer writes on the next save
+        self.failed_writes: list[tuple] = []
+
+        self.save_requested: Event = Event()
+
+        self.save_thread: Thread = Thread(target=self._worker, name="BGSTally Save worker")
+        self.save_thread.daemon = True
+        self.save_thread.start()
+
+
+    def queue_save(self):
+        """
+        Request a save in the background. Returns immediately.
+        """
+        self.save_requested.set()
+
+
+    def flush(self):
+        """
+        Save all changed stores immediately, on the calling thread. Any pending background save is made redundant.
+        Must not be called while holding lock.
+        """
+        self.save_requested.clear()
+        self._save()
+
+
+    def _save(self):
+        """
+        Save all stores
+        """
+        with self.write_lock:
+            writes: list[tuple] = self.failed_writes
+
+            with self.lock:
+                for store in self.stores:
+                    try:
+                        writes.extend((store, write) for write in store.prepare_save())
+                    except Exception as e:
+                        # The store remains dirty, so it will be saved again next time round
+                        Debug.logger.error(f"Unable to save {type(store).__name__}", exc_info=e)
+
+            self.failed_writes = self._write(writes)
+
+
+    def _write(self, writes: list[tuple]) -> list[tuple]:
+        """
+        Make prepared writes, returning those that failed. Once one of a store's writes has failed, its later writes are
+        held back too, so they are never made out of order.
+        """
+        failed_writes: list[tuple] = []
+        failed_stores: set = set()
+
+        for store, write in writes:
+            if id(store) not in failed_stores:
+                try:
+                    write.write()
+                    continue
+                except Exception as e:
+                    Debug.logger.error(f"Unable to save {type(store).__name__}, trying again on next save", exc_info=e)
+                    failed_stores.add(id(store))
+
+            failed_writes.append((store, write))
+
+        return failed_writes
+
+
+    def _worker(self) -> None:
+        """
+        Handle save thread work
+        """
+        Debug.logger.debug("Starting Save Worker...")
+
+        while True:
+            # Blocks indefinitely until a save is requested
+            self.save_requested.wait()
+
+            if config.shutting_down:
+                # A final flush is made from plugin_stop()
+                Debug.logger.debug("Shutting down Save Worker...")
+                return
+
+            # Allow further requests to accumulate, so we only save once for a burst of changes
+            sleep(TIME_SAVE_DEBOUNCE_S)
+            self.save_requested.clear()
+
+            self._save()
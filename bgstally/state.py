@@ -11,6 +11,7 @@ class State:
 
     def __init__(self, bgstally):
         self.bgstally = bgstally
+        self.dirty:bool = False
         self.load()
 
 
@@ -37,6 +38,13 @@ class State:
         self.DiscordActivity:tk.StringVar = tk.StringVar(value=config.get_str('BGST_DiscordActivity', default=DiscordActivity.BOTH))
         self.DiscordFleetCarrier: tk.StringVar = tk.StringVar(value=config.get_str('BGST_DiscordFleetCarrier', default=DiscordFleetCarrier.BOTH))
 
+        # Flag our state as needing a save whenever any UI preference changes
+        for var in [self.Status, self.ShowZeroActivitySystems, self.AbbreviateFactionNames, self.IncludeSecondaryInf, self.DiscordUsername,
+                    self.EnableOverlay, self.EnableOverlayCurrentTick, self.EnableOverlayActivity, self.EnableOverlayTWProgress,
+                    self.EnableOverlaySystem, self.EnableOverlayWarning, self.EnableOverlayCMDR, self.EnableSystemActivityByDefault,
+                    self.DetailedInf, self.DetailedTrade, self.DiscordActivity, self.DiscordFleetCarrier]:
+            var.trace_add('write', self._preference_changed)
+
         # TODO: Legacy values, used to migrate initial state, remove in future version
         self.DiscordBGSWebhook:tk.StringVar = tk.StringVar(value=config.get_str('XDiscordWebhook', default=""))
         self.DiscordCMDRInformationWebhook:tk.StringVar = tk.StringVar(value=config.get_str("BGST_DiscordCMDRInformationWebhook", default=""))
@@ -45,7 +53,7 @@ class State:
         self.DiscordTWWebhook:tk.StringVar = tk.StringVar(value=config.get_str("XDiscordTWWebhook", default=""))
 
         # Persistent values
-        self.current_system_id:str = config.get_str('XCurrentSystemID', default="")
+        self.current_system_id:str = config.get_str('XCurrentSystemID', default="") # SystemAddress, as a str to match Activity system keys
         self.station_faction:str = config.get_str('XStationFaction', default = "")
         self.station_type:str = config.get_str('XStationType', default ="")
         self.discord_lang:str|None = config.get_str('BGST_DiscordLang', default="")
@@ -81,8 +89,9 @@ class State:
 
     def save(self):
         """
-        Save our state
+        Save our state, if it has changed
         """
+        if not self.dirty: return
 
         # UI preference fields
         config.set('BGST_Status', self.Status.get())
@@ -109,3 +118,12 @@ class State:
         config.set('XStationType', self.station_type if self.station_type != None else "")
         config.set('BGST_DiscordLang', self.discord_lang if self.discord_lang != None else "")
         config.set('BGST_DiscordFormatter', self.discord_formatter if self.discord_formatter != None else "")
+
+        self.dirty = False
+
+
+    def _preference_changed(self, *args):
+        """
+        Callback (set as a variable trace) for when any UI preference is changed
+        """
+        self.dirty = True
@@ -1,21 +1,36 @@
+import heapq
 import json
+import os
 import os.path
 import re
+from collections import OrderedDict
 from copy import copy
 from datetime import datetime, timedelta
+from json import JSONDecodeError
+from threading import Timer
 
 from requests import Response
 
-from bgstally.constants import DATETIME_FORMAT_JOURNAL, FOLDER_OTHER_DATA, CmdrInteractionReason, RequestMethod
+from bgstally.constants import DATETIME_FORMAT_JOURNAL, FILE_SUFFIX, FOLDER_OTHER_DATA, CmdrInteractionReason, RequestMethod
 from bgstally.debug import Debug
+from bgstally.inaracache import InaraCache
 from bgstally.requestmanager import BGSTallyRequest
+from bgstally.savemanager import FileWrite
 from bgstally.utils import _, __
 from thirdparty.colors import *
 
-FILENAME = "targetlog.json"
+FILENAME_LEGACY = "targetlog.json"
+FILENAME_INDEX = "targetindex.json"
+FOLDER_TARGETLOG = "targetlog"
+DATE_FORMAT_PARTITION = "%Y-%m-%d"
 TIME_TARGET_LOG_EXPIRY_D = 90
+TIME_TARGET_LOG_PARTITION_D = 7
 URL_INARA_API = "https://inara.cz/inapi/v1/"
+TIME_INARA_BATCH_S = 2
+BATCH_INARA_MAX_SIZE = 20
 DATETIME_FORMAT_INARA = "%Y-%m-%dT%H:%M:%SZ"
+# Key of the row ID in each target. Row IDs are given to targets as they are loaded or logged, and are not saved.
+KEY_ROW_ID = "RowID"
 
 
 class TargetManager:
@@ -26,51 +41,199 @@ class TargetManager:
 
     def __init__(self, bgstally):
         self.bgstally = bgstally
-        self.targetlog = []
-        self.cmdr_cache = {}
+        # The target log is stored in weekly partitions, each loaded from disk only when needed.
+        # key = partition start date, value = list of targets in the partition, or None if not yet loaded
+        self.partitions: dict[str, list|None] = {}
+        # Keys of partitions that have changed and need saving
+        self.dirty_partitions: set[str] = set()
+        # Indexes of all loaded targets. Row IDs are unique for the session and never re-used, for use as list row IDs.
+        self.targets_by_row_id: dict[str, dict] = {}
+        self.row_id_sequence: int = 0
+        self.latest_targets: dict[str, dict] = {} # key = CMDR name, value = latest target entry for that CMDR
+        self.all_partitions_loaded: bool = False
+        # Index of the newest partition holding an entry for each CMDR, so a CMDR can be looked up without loading every
+        # partition. key = CMDR name, value = partition key. May point at a partition whose entries for the CMDR have
+        # since been deleted or expired, which is corrected when the CMDR is next looked up.
+        self.cmdr_partitions: dict[str, str] = {}
+        self.cmdr_partitions_dirty: bool = False
+        # False if there was no saved index for existing partitions, so the index only covers loaded partitions
+        self.cmdr_partitions_complete: bool = True
+        # Latest data for each CMDR seen this session, least recently seen first. Limited to the same size as the Inara cache.
+        self.cmdr_cache: OrderedDict = OrderedDict()
+        self.inara_cache: InaraCache = InaraCache(bgstally)
+        # Outstanding Inara lookups, both waiting to be sent and in flight. key = CMDR name, value = list of CMDR data for
+        # every interaction with the CMDR while the lookup is outstanding, so only one lookup is made per CMDR.
+        self.pending_lookups: dict[str, list[dict]] = {}
+        # Names of CMDRs waiting to be looked up. Lookups are batched up for a short time and sent in a single request.
+        self.unsent_lookups: list[str] = []
+        self.lookup_timer: Timer|None = None
+        # Min-heap of (time to remove target, sequence number, target) for all loaded targets. The sequence number keeps
+        # ordering stable for equal times.
+        self.expiry_heap: list[tuple] = []
+        self.expiry_sequence: int = 0
         self.load()
-        self._expire_old_targets()
+        self.expire_old_targets()
 
 
     def load(self):
         """
-        Load state from file
+        Find all stored target log partitions, and migrate the legacy single-file target log if it exists
         """
-        file = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
+        folder:str = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FOLDER_TARGETLOG)
+        if os.path.exists(folder):
+            for filename in os.listdir(folder):
+                if filename.endswith(FILE_SUFFIX): self.partitions[filename[:-len(FILE_SUFFIX)]] = None
+
+        file = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME_INDEX)
         if os.path.exists(file):
             try:
                 with open(file) as json_file:
-                    self.targetlog = json.load(json_file)
+                    self.cmdr_partitions = json.load(json_file)
+
+                # The index is saved after the partitions, so a partition changed more recently than the index was saved
+                # without it, e.g. because EDMC crashed
+                index_time:float = os.path.getmtime(file)
+                for key in self.partitions.keys():
+                    if os.path.getmtime(os.path.join(folder, key + FILE_SUFFIX)) > index_time: self.cmdr_partitions_complete = False
             except Exception as e:
                 Debug.logger.info(f"Unable to load {file}")
+                self.cmdr_partitions_complete = False
+        elif self.partitions:
+            self.cmdr_partitions_complete = False
+
+        file = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME_LEGACY)
+        if os.path.exists(file):
+            try:
+                with open(file) as json_file:
+                    targetlog:list = json.load(json_file)
+                for target in targetlog: self._add_to_targetlog(target)
+                # Make sure the partitions are safely on disk before removing the legacy file
+                for write in self.prepare_save(): write.write()
+                os.remove(file)
+            except Exception as e:
+                Debug.logger.info(f"Unable to load and migrate {file}")
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save state to file
+        Prepare all changed partitions of the target log, and the Inara cache, to be saved
         """
-        file = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
-        with open(file, 'w') as outfile:
-            json.dump(self.targetlog, outfile)
+        writes:list[FileWrite] = self.inara_cache.prepare_save()
+
+        if self.dirty_partitions: writes.extend(self._prepare_save_partitions())
+
+        # The index is written after the partitions, so it never refers to a partition that isn't on disk yet
+        if self.cmdr_partitions_dirty:
+            writes.append(FileWrite(os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME_INDEX), json.dumps(self.cmdr_partitions, separators=(',', ':'))))
+            self.cmdr_partitions_dirty = False
+
+        return writes
+
+
+    def _prepare_save_partitions(self) -> list[FileWrite]:
+        """
+        Prepare all changed partitions of the target log to be saved
+        """
+        writes:list[FileWrite] = []
+        folder:str = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FOLDER_TARGETLOG)
+        if not os.path.exists(folder): os.mkdir(folder)
+
+        for key in self.dirty_partitions:
+            file:str = os.path.join(folder, key + FILE_SUFFIX)
+            targets:list|None = self.partitions.get(key)
+
+            if targets:
+                targets = [{k: v for k, v in target.items() if k != KEY_ROW_ID} for target in targets]
+                writes.append(FileWrite(file, json.dumps(targets, separators=(',', ':'))))
+            else:
+                # Partition is empty or has been expired
+                self.partitions.pop(key, None)
+                writes.append(FileWrite(file, None))
+
+        self.dirty_partitions = set()
+        return writes
 
 
     def get_targetlog(self):
         """
-        Get the current target log
+        Get the current target log, loading all partitions if needed
         """
-        index:int = 0
-        for target in self.targetlog:
-            target['index'] = index
-            index += 1
+        targetlog:list = []
+        with self.bgstally.save_manager.lock:
+            for key in sorted(self.partitions.keys()):
+                targetlog.extend(self._get_partition(key))
+            self.all_partitions_loaded = True
+
+            if not self.cmdr_partitions_complete:
+                # Every partition has now been indexed, so the index can be saved for next time
+                self.cmdr_partitions_complete = True
+                self.cmdr_partitions_dirty = True
 
-        return self.targetlog
+        return targetlog
 
 
     def get_target_info(self, cmdr_name:str):
         """
-        Look up and return latest information on a CMDR
+        Look up and return latest information on a CMDR. Only the partitions needed to find the CMDR's latest entry are
+        loaded, starting from the newest partition the CMDR is indexed in.
         """
-        return next((item for item in reversed(self.targetlog) if item['TargetName'] == cmdr_name), None)
+        with self.bgstally.save_manager.lock:
+            if self.all_partitions_loaded: return self.latest_targets.get(cmdr_name)
+
+            if not self.cmdr_partitions_complete:
+                # There's no saved index yet, build it from the whole target log
+                self.get_targetlog()
+                return self.latest_targets.get(cmdr_name)
+
+            newest_key:str|None = self.cmdr_partitions.get(cmdr_name)
+            if newest_key is None: return None
+
+            for key in sorted((key for key in self.partitions.keys() if key <= newest_key), reverse=True):
+                self._get_partition(key)
+
+                # Every partition from this one onwards has been checked, and those not yet checked only hold older targets.
+                # Journal timestamps and partition keys compare correctly as strings.
+                latest:dict|None = self.latest_targets.get(cmdr_name)
+                if latest is not None and latest['Timestamp'] >= key:
+                    if key != newest_key: self._set_cmdr_partition(cmdr_name, key)
+                    return latest
+
+            # All entries for the CMDR have been deleted or expired
+            self._set_cmdr_partition(cmdr_name, None)
+            return None
+
+
+    def get_target_row_id(self, target:dict) -> str:
+        """
+        Get the row ID for a target in the target log
+        """
+        return target.get(KEY_ROW_ID)
+
+
+    def get_target_by_row_id(self, row_id:str) -> dict|None:
+        """
+        Look up a target in the target log by its row ID
+        """
+        return self.targets_by_row_id.get(str(row_id))
+
+
+    def delete_targets(self, targets:list):
+        """
+        Delete the given targets from the target log
+        """
+        with self.bgstally.save_manager.lock:
+            for target in targets:
+                key:str = self._get_partition_key(datetime.strptime(target['Timestamp'], DATETIME_FORMAT_JOURNAL))
+                partition:list = self._get_partition(key)
+
+                for i in range(len(partition)):
+                    if partition[i] is target:
+                        partition.pop(i)
+                        self._unindex_target(target)
+                        self.dirty_partitions.add(key)
+                        break
+
+        self.bgstally.save_manager.queue_save()
 
 
     def ship_targeted(self, journal_entry: dict, system: str):
@@ -107,7 +270,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending:self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -127,7 +290,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending: self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -151,7 +314,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending: self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -173,7 +336,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending: self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -201,7 +364,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
             cmdr_data, different, pending = self._fetch_cmdr_info(killer_name[5:], cmdr_data)
-            if different and not pending: self.targetlog.append(cmdr_data)
+            if different and not pending: self._add_to_targetlog(cmdr_data)
             if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -224,7 +387,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending: self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -244,7 +407,7 @@ class TargetManager:
                     'Timestamp': journal_entry['timestamp']}
 
         cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
-        if different and not pending: self.targetlog.append(cmdr_data)
+        if different and not pending: self._add_to_targetlog(cmdr_data)
         if not pending: self.bgstally.ui.show_cmdr_report(cmdr_data)
 
 
@@ -322,61 +485,273 @@ class TargetManager:
             cmdr_data_copy['Reason'] = cmdr_data.get('Reason', CmdrInteractionReason.SCANNED)
             cmdr_data_copy['Timestamp'] = cmdr_data.get('Timestamp')
             # Re-cache the data with the latest updates
-            self.cmdr_cache[cmdr_name] = cmdr_data_copy
+            self._cache_cmdr(cmdr_data_copy)
             return cmdr_data_copy, True, False
 
-        # CMDR data not in cache, create a background request to fetch Inara data
-        payload = {
-            'header': {
-                'appName': self.bgstally.plugin_name,
-                'appVersion': str(self.bgstally.version),
-                'isBeingDeveloped': "false",
-                'APIkey': self.bgstally.config.apikey_inara()
-            },
-            'events': [
-                {
-                    'eventName': "getCommanderProfile",
-                    'eventTimestamp': datetime.utcnow().strftime(DATETIME_FORMAT_INARA),
-                    'eventData': {
-                        'searchName': cmdr_name
-                    }
-                }
-            ]
-        }
-
-        self.bgstally.request_manager.queue_request(URL_INARA_API, RequestMethod.POST, callback=self._inara_data_received, payload=payload, data=cmdr_data)
+        # CMDR profile cached from Inara in a previous session
+        profile:dict|None = self.inara_cache.get(cmdr_name)
+        if profile is not None:
+            cmdr_data |= profile
+            self._cache_cmdr(cmdr_data)
+            return cmdr_data, True, False
+
+        # CMDR data not in cache. If we're already looking this CMDR up, wait for that lookup.
+        if cmdr_name in self.pending_lookups:
+            self.pending_lookups[cmdr_name].append(cmdr_data)
+            return cmdr_data, True, True
+
+        # Queue an Inara lookup. Lookups are sent in batches after a short delay.
+        self.pending_lookups[cmdr_name] = [cmdr_data]
+        self.unsent_lookups.append(cmdr_name)
+        if self.lookup_timer is None:
+            self.lookup_timer = Timer(TIME_INARA_BATCH_S, self._send_inara_lookups)
+            self.lookup_timer.daemon = True
+            self.lookup_timer.start()
 
         return cmdr_data, True, True
 
 
+    def _send_inara_lookups(self):
+        """
+        Send all pending Inara lookups, batching multiple CMDRs into each request
+        """
+        with self.bgstally.save_manager.lock:
+            unsent_lookups:list = self.unsent_lookups
+            self.unsent_lookups = []
+            self.lookup_timer = None
+
+        for i in range(0, len(unsent_lookups), BATCH_INARA_MAX_SIZE):
+            batch:list = unsent_lookups[i:i + BATCH_INARA_MAX_SIZE]
+            payload = {
+                'header': {
+                    'appName': self.bgstally.plugin_name,
+                    'appVersion': str(self.bgstally.version),
+                    'isBeingDeveloped': "false",
+                    'APIkey': self.bgstally.config.apikey_inara()
+                },
+                'events': [
+                    {
+                        'eventCustomID': index,
+                        'eventName': "getCommanderProfile",
+                        'eventTimestamp': datetime.utcnow().strftime(DATETIME_FORMAT_INARA),
+                        'eventData': {
+                            'searchName': cmdr_name
+                        }
+                    } for index, cmdr_name in enumerate(batch)
+                ]
+            }
+
+            self.bgstally.request_manager.queue_request(URL_INARA_API, RequestMethod.POST, callback=self._inara_data_received, payload=payload, data=batch)
+
+
     def _inara_data_received(self, success:bool, response:Response, request:BGSTallyRequest):
         """
-        A queued inara request has returned data, process it
+        A queued batch of inara requests has returned data, process it for each CMDR in the batch
         """
+        batch:list = request.data
+        events:list = []
+
         if success:
-            cmdr_data:dict = request.data
-            response_data = response.json()
-            if 'events' in response_data and len(response_data['events']) > 0 and 'eventData' in response_data['events'][0]:
-                event_data = response_data['events'][0]['eventData']
+            try:
+                events = response.json().get('events', [])
+            except (JSONDecodeError, AttributeError):
+                Debug.logger.warning(f"Inara CMDR data is invalid")
+
+        # Match up results to CMDRs using our custom ID, falling back to the order of the results
+        results:dict = {}
+        for position, event in enumerate(events):
+            if isinstance(event, dict): results[event.get('eventCustomID', position)] = event
+
+        for index, cmdr_name in enumerate(batch):
+            event:dict|None = results.get(index)
+            profile:dict|None = None
+
+            if event is not None and event.get('eventStatus', 200) < 400:
+                # A result with no eventData means the CMDR isn't on Inara, which is also worth caching
+                profile = {}
+                event_data = event.get('eventData', {})
 
                 if 'commanderRanksPilot' in event_data:
-                    cmdr_data['ranks'] = event_data['commanderRanksPilot']
+                    profile['ranks'] = event_data['commanderRanksPilot']
                 if 'commanderSquadron' in event_data:
-                    cmdr_data['squadron'] = event_data['commanderSquadron']
+                    profile['squadron'] = event_data['commanderSquadron']
                 if 'inaraURL' in event_data:
-                    cmdr_data['inaraURL'] = event_data['inaraURL']
+                    profile['inaraURL'] = event_data['inaraURL']
+
+            # This runs on the request thread, so hold the save lock while we change the target log
+            with self.bgstally.save_manager.lock:
+                waiting_cmdr_data:list = self.pending_lookups.pop(cmdr_name, [])
+                if len(waiting_cmdr_data) == 0: continue
+                if profile is not None: self.inara_cache.put(cmdr_name, profile)
+
+                # In all cases (even Inara failure) add the CMDR to the cache and log because we will at least have in-game data for them
+                cmdr_data:dict = waiting_cmdr_data[0]
+                if profile is not None: cmdr_data |= profile
+                self._cache_cmdr(cmdr_data)
+                self._add_to_targetlog(cmdr_data)
+                self.bgstally.ui.show_cmdr_report(cmdr_data)
+
+                # Any further interactions during the lookup are now handled from the cache, as if they happened afterwards
+                for cmdr_data in waiting_cmdr_data[1:]:
+                    cmdr_data, different, pending = self._fetch_cmdr_info(cmdr_name, cmdr_data)
+                    if different: self._add_to_targetlog(cmdr_data)
+                    self.bgstally.ui.show_cmdr_report(cmdr_data)
 
-        # In all cases (even Inara failure) add the CMDR to the cache and log because we will at least have in-game data for them
+
+    def _cache_cmdr(self, cmdr_data:dict):
+        """
+        Cache the latest data for a CMDR for this session, discarding the least recently seen CMDR if the cache is full
+        """
         self.cmdr_cache[cmdr_data['TargetName']] = cmdr_data
-        self.targetlog.append(cmdr_data)
-        self.bgstally.ui.show_cmdr_report(cmdr_data)
+        self.cmdr_cache.move_to_end(cmdr_data['TargetName'])
+        while len(self.cmdr_cache) > self.inara_cache.max_size: self.cmdr_cache.popitem(last=False)
+
+
+    def _add_to_targetlog(self, cmdr_data:dict):
+        """
+        Add an entry to the target log
+        """
+        timestamp:datetime = datetime.strptime(cmdr_data['Timestamp'], DATETIME_FORMAT_JOURNAL)
+        key:str = self._get_partition_key(timestamp)
+        self._get_partition(key).append(cmdr_data)
+        self._index_target(cmdr_data, key)
+        self._schedule_expiry(cmdr_data, timestamp)
+        self.dirty_partitions.add(key)
+
+
+    def expire_old_targets(self) -> bool:
+        """
+        Clear out all old targets from the target log. Returns True if any targets were removed.
+        """
+        now:datetime = datetime.utcnow()
+        removed:bool = False
+
+        # Drop whole partitions that have expired, without needing to load them
+        for key in list(self.partitions.keys()):
+            partition_end:datetime = datetime.strptime(key, DATE_FORMAT_PARTITION) + timedelta(days = TIME_TARGET_LOG_PARTITION_D)
+            if partition_end + timedelta(days = TIME_TARGET_LOG_EXPIRY_D) <= now:
+                for target in self.partitions[key] or []: self._unindex_target(target, expired=True)
+                self.partitions[key] = []
+                self.dirty_partitions.add(key)
+                removed = True
+
+                # All older partitions have expired too, so CMDRs indexed in this partition have no entries left
+                for cmdr_name in [cmdr_name for cmdr_name, cmdr_key in self.cmdr_partitions.items() if cmdr_key == key]:
+                    self._set_cmdr_partition(cmdr_name, None)
+
+        # Remove expired individual targets from loaded partitions
+        expired:dict[str, set] = {}
+
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            removal_time, _, target = heapq.heappop(self.expiry_heap)
+            key:str = self._get_partition_key(removal_time - timedelta(days = TIME_TARGET_LOG_EXPIRY_D))
+            expired.setdefault(key, set()).add(target[KEY_ROW_ID])
+
+        for key, expired_ids in expired.items():
+            partition:list|None = self.partitions.get(key)
+            if not partition: continue
+
+            # Remove all expired targets from the partition in a single pass
+            remaining:list = []
+            for target in partition:
+                if target[KEY_ROW_ID] in expired_ids:
+                    self._unindex_target(target, expired=True)
+                else:
+                    remaining.append(target)
+            self.partitions[key] = remaining
+            self.dirty_partitions.add(key)
+            removed = True
+
+        return removed
+
+
+    def _get_partition_key(self, timestamp:datetime) -> str:
+        """
+        Get the key of the partition that holds targets with the given timestamp. Partitions start on a Monday.
+        """
+        return (timestamp - timedelta(days = timestamp.weekday())).strftime(DATE_FORMAT_PARTITION)
+
+
+    def _get_partition(self, key:str) -> list:
+        """
+        Get the targets in a partition, loading it from disk if it isn't already loaded. A new empty partition is created
+        if it doesn't exist.
+        """
+        partition:list|None = self.partitions.get(key)
+        if partition is not None: return partition
+
+        partition = []
+        file:str = os.path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FOLDER_TARGETLOG, key + FILE_SUFFIX)
+        if os.path.exists(file):
+            try:
+                with open(file) as json_file:
+                    partition = json.load(json_file)
+            except Exception as e:
+                Debug.logger.info(f"Unable to load {file}")
+
+        self.partitions[key] = partition
+        for target in partition:
+            target.pop('index', None) # Row indexes were stored by older versions
+            self._index_target(target, key)
+            self._schedule_expiry(target, datetime.strptime(target['Timestamp'], DATETIME_FORMAT_JOURNAL))
+
+        return partition
+
+
+    def _index_target(self, target:dict, key:str):
+        """
+        Give a loaded target in partition key a new row ID, and add it to the row ID and CMDR name indexes. Any row ID the
+        target already has (e.g. copied from an earlier target for the same CMDR) is replaced.
+        """
+        target[KEY_ROW_ID] = str(self.row_id_sequence)
+        self.row_id_sequence += 1
+        self.targets_by_row_id[target[KEY_ROW_ID]] = target
+
+        self._update_latest_target(target)
+
+        if key > self.cmdr_partitions.get(target['TargetName'], ""): self._set_cmdr_partition(target['TargetName'], key)
+
+
+    def _set_cmdr_partition(self, cmdr_name:str, key:str|None):
+        """
+        Set the newest partition holding an entry for a CMDR, or None if there are no entries for the CMDR
+        """
+        if key is None:
+            self.cmdr_partitions.pop(cmdr_name, None)
+        else:
+            self.cmdr_partitions[cmdr_name] = key
+        self.cmdr_partitions_dirty = True
+
+
+    def _update_latest_target(self, target:dict):
+        """
+        Make a target the latest for its CMDR, if it is newer than the current latest
+        """
+        latest:dict|None = self.latest_targets.get(target['TargetName'])
+        # Journal timestamps sort correctly as strings
+        if latest is None or target['Timestamp'] >= latest['Timestamp']: self.latest_targets[target['TargetName']] = target
+
+
+    def _unindex_target(self, target:dict, expired:bool = False):
+        """
+        Remove a target from the row ID and CMDR name indexes. If an expired target was the latest for its CMDR, all older
+        entries for the CMDR have also expired.
+        """
+        self.targets_by_row_id.pop(target.get(KEY_ROW_ID), None)
+
+        if self.latest_targets.get(target['TargetName']) is not target: return
+        del self.latest_targets[target['TargetName']]
+        if expired: return
+
+        # Find the next latest entry for this CMDR
+        for partition in self.partitions.values():
+            for other_target in partition or []:
+                if other_target['TargetName'] == target['TargetName'] and other_target is not target: self._update_latest_target(other_target)
 
 
-    def _expire_old_targets(self):
+    def _schedule_expiry(self, target:dict, timestamp:datetime):
         """
-        Clear out all old targets from the target log
+        Add a target to the expiry heap
         """
-        for target in reversed(self.targetlog):
-            timedifference = datetime.utcnow() - datetime.strptime(target['Timestamp'], DATETIME_FORMAT_JOURNAL)
-            if timedifference > timedelta(days = TIME_TARGET_LOG_EXPIRY_D):
-                self.targetlog.remove(target)
+        heapq.heappush(self.expiry_heap, (timestamp + timedelta(days = TIME_TARGET_LOG_EXPIRY_D), self.expiry_sequence, target))
+        self.expiry_sequence += 1
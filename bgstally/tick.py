@@ -24,6 +24,7 @@ class Tick:
         self.bgstally = bgstally
         self.tick_id: str = TICKID_UNKNOWN
         self.tick_time: datetime = (datetime.utcnow() - timedelta(days = 30)) # Default to a tick a month old
+        self.dirty: bool = False
         if load: self.load()
 
 
@@ -54,6 +55,7 @@ class Tick:
                 self.tick_time = tick_time
                 h = hashlib.shake_128(self.get_formatted().encode("utf-8"), usedforsecurity=False)
                 self.tick_id = f"zoy-{h.hexdigest(10)}"
+                self.dirty = True
 
                 return True
 
@@ -68,6 +70,7 @@ class Tick:
         self.tick_time = datetime.now()
         h = hashlib.shake_128(self.get_formatted().encode("utf-8"), usedforsecurity=False)
         self.tick_id = f"frc-{h.hexdigest(10)}"
+        self.dirty = True
 
 
     def load(self):
@@ -78,12 +81,16 @@ class Tick:
         self.tick_time = datetime.strptime(config.get_str("XTickTime", default=self.tick_time.strftime(DATETIME_FORMAT_TICK_DETECTOR)), DATETIME_FORMAT_TICK_DETECTOR)
 
 
-    def save(self):
+    def prepare_save(self) -> list:
         """
-        Save tick status to config
+        Save tick status to config, if it has changed. Config is saved by EDMC, so there are no files for us to write.
         """
+        if not self.dirty: return []
+
         config.set('XLastTick', self.tick_id)
         config.set('XTickTime', self.tick_time.strftime(DATETIME_FORMAT_TICK_DETECTOR))
+        self.dirty = False
+        return []
 
 
     def get_formatted(self, format: str = DATETIME_FORMAT_DISPLAY) -> str:
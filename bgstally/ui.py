@@ -280,12 +280,12 @@ class UI:
         self.update_plugin_frame()
 
 
-    def show_system_report(self, system_address: int):
+    def show_system_report(self, system_address: str):
         """
         Show the system report overlay
         """
         self.indicate_activity = True
-        self.report_system_address = str(system_address)
+        self.report_system_address = system_address
 
 
     def show_cmdr_report(self, cmdr_data: dict):
@@ -338,6 +338,7 @@ class UI:
         """
         langs_by_name: dict = {v: k for k, v in self.languages.items()}  # Codes by name
         self.bgstally.state.discord_lang = langs_by_name.get(self.language.get()) or ''  # or '' used here due to Default being None above
+        self.bgstally.state.dirty = True
 
 
     def _formatter_modified(self, event=None):
@@ -348,6 +349,7 @@ class UI:
         """
         formatters_by_name: dict = {v: k for k, v in self.formatters.items()}
         self.bgstally.state.discord_formatter = formatters_by_name.get(self.formatter.get())
+        self.bgstally.state.dirty = True
 
 
     def _worker(self) -> None:
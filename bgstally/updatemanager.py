@@ -7,7 +7,7 @@ import plug
 from requests import Response
 from semantic_version import Version
 
-from bgstally.constants import FOLDER_BACKUPS, FOLDER_UPDATES, RequestMethod
+from bgstally.constants import FOLDER_BACKUPS, FOLDER_UPDATES, RequestMethod, RequestPriority
 from bgstally.debug import Debug
 from bgstally.requestmanager import BGSTallyRequest
 from bgstally.utils import _
@@ -49,7 +49,7 @@ class UpdateManager:
         except OSError as e:
             if e.errno != errno.EEXIST: return
 
-        self.bgstally.request_manager.queue_request(URL_PLUGIN_VERSION, RequestMethod.GET, callback=self._version_info_received)
+        self.bgstally.request_manager.queue_request(URL_PLUGIN_VERSION, RequestMethod.GET, callback=self._version_info_received, priority=RequestPriority.BACKGROUND)
 
 
     def _version_info_received(self, success:bool, response:Response, request:BGSTallyRequest):
@@ -81,7 +81,7 @@ class UpdateManager:
 
         if self.remote_version > self.bgstally.version:
             # Download the new release
-            self.bgstally.request_manager.queue_request(self.release_url, RequestMethod.GET, callback=self._download_received, stream=True)
+            self.bgstally.request_manager.queue_request(self.release_url, RequestMethod.GET, callback=self._download_received, stream=True, priority=RequestPriority.BACKGROUND)
 
 
     def _download_received(self, success:bool, response:Response, request:BGSTallyRequest):
@@ -1,7 +1,8 @@
 import functools
-from os import listdir
-from os.path import join
+from os import fdopen, fsync, listdir, remove, replace
+from os.path import basename, dirname, join
 from pathlib import Path
+from tempfile import mkstemp
 
 import semantic_version
 
@@ -141,3 +142,25 @@ def all_subclasses(cls: type) -> set[type]:
         set[type]: A set of Python subclasses
     """
     return set(cls.__subclasses__()).union([s for c in cls.__subclasses__() for s in all_subclasses(c)])
+
+
+def write_text_atomic(filepath: str, text: str):
+    """Write text to a file atomically. The text is written to a temporary file in the same folder, flushed to disk and
+    then renamed over the target file, so a crash part-way through never leaves the target file truncated.
+
+    Args:
+        filepath (str): The full path of the file to write
+        text (str): The text to write
+    """
+    fd, temp_filepath = mkstemp(prefix=f"{basename(filepath)}.", suffix=".tmp", dir=dirname(filepath))
+
+    try:
+        with fdopen(fd, 'w', encoding='utf-8') as outfile:
+            outfile.write(text)
+            outfile.flush()
+            fsync(outfile.fileno())
+
+        replace(temp_filepath, filepath)
+    except Exception:
+        remove(temp_filepath)
+        raise
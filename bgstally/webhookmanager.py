@@ -4,6 +4,7 @@ from secrets import token_hex
 
 from bgstally.constants import DiscordChannel, FOLDER_OTHER_DATA
 from bgstally.debug import Debug
+from bgstally.savemanager import FileWrite
 from thirdparty.colors import *
 
 FILENAME = "webhooks.json"
@@ -16,6 +17,7 @@ class WebhookManager:
     def __init__(self, bgstally):
         self.bgstally = bgstally
         self.data:dict = {}
+        self.dirty:bool = False
 
         self.load()
 
@@ -34,6 +36,7 @@ class WebhookManager:
 
         if self.data == {}:
             # We are in default state, initialise from legacy data
+            self.dirty = True
             self.data = {
                 'webhooks':
                     [
@@ -56,13 +59,16 @@ class WebhookManager:
             }
 
 
-    def save(self):
+    def prepare_save(self) -> list[FileWrite]:
         """
-        Save state to file
+        Prepare state to be saved to file, if it has changed
         """
+        if not self.dirty: return []
+
         file = path.join(self.bgstally.plugin_dir, FOLDER_OTHER_DATA, FILENAME)
-        with open(file, 'w') as outfile:
-            json.dump(self._as_dict(), outfile)
+        text:str = json.dumps(self._as_dict())
+        self.dirty = False
+        return [FileWrite(file, text)]
 
 
     def set_webhooks_from_list(self, data: list):
@@ -73,9 +79,10 @@ class WebhookManager:
             data (list): A list containing the webhooks, each webhook being a list
         """
         self.data['webhooks'] = []
+        self.dirty = True
 
         if data is None or data == []:
-            self.save()
+            self.bgstally.save_manager.queue_save()
             return
 
         for webhook in data:
@@ -91,7 +98,7 @@ class WebhookManager:
                     DiscordChannel.CMDR_INFORMATION: webhook[7]
                 })
 
-        self.save()
+        self.bgstally.save_manager.queue_save()
 
 
     def get_webhooks_as_dict(self, channel:DiscordChannel|None = None) -> list:
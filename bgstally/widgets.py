@@ -318,6 +318,49 @@ class TreeviewPlus(ttk.Treeview):
         self.datetime_format = datetime_format
         self.bind('<ButtonRelease-1>', self._select_item)
 
+        # For paged lists, the items still to be inserted and the function that builds an (iid, values) row from an item
+        self.pending_items: list = []
+        self.pending_index: int = 0
+        self.page_size: int = 0
+        self.row_builder: callable = None
+
+
+    def insert_paged(self, items:list, row_builder:callable, page_size:int):
+        """
+        Insert a large list of items a page at a time. The first page is inserted immediately, and further pages as the
+        user scrolls towards the end of the list. row_builder is called as row_builder(item) and should return an
+        (iid, values) tuple. All remaining items are inserted before the list is sorted.
+        """
+        self.pending_items = items
+        self.pending_index = 0
+        self.page_size = page_size
+        self.row_builder = row_builder
+        self._insert_page()
+
+
+    def paged_yscrollcommand(self, scrollbar_command:callable) -> callable:
+        """
+        Wrap a scrollbar's set command so further pages are inserted when the list is scrolled near the end
+        """
+        def _scrolled(first, last):
+            scrollbar_command(first, last)
+            if float(last) > 0.9 and self.pending_index < len(self.pending_items): self.after_idle(self._insert_page)
+
+        return _scrolled
+
+
+    def _insert_page(self, all_pages:bool = False):
+        """
+        Insert the next page of pending items, or all remaining items if all_pages is True
+        """
+        end:int = len(self.pending_items) if all_pages else min(self.pending_index + self.page_size, len(self.pending_items))
+
+        for item in self.pending_items[self.pending_index:end]:
+            iid, values = self.row_builder(item)
+            self.insert("", 'end', iid=iid, values=values)
+
+        self.pending_index = end
+
 
     def heading(self, column, sort_by=None, **kwargs):
         if sort_by and not hasattr(kwargs, 'command'):
@@ -341,6 +384,7 @@ class TreeviewPlus(ttk.Treeview):
             self.callback(clicked_item['values'], clicked_column, self, iid)
 
     def _sort(self, column, reverse, data_type, callback):
+        self._insert_page(all_pages=True)
         l = [(self.set(k, column), k) for k in self.get_children('')]
         l.sort(key=lambda t: data_type(t[0]), reverse=reverse)
         for index, (_, k) in enumerate(l):
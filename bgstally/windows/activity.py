@@ -7,7 +7,7 @@ from ttkHyperlinkLabel import HyperlinkLabel
 
 from bgstally.activity import STATES_WAR, Activity
 from bgstally.constants import (COLOUR_HEADING_1, FOLDER_ASSETS, FONT_HEADING_1, FONT_HEADING_2, FONT_TEXT, CheckStates, CZs, DiscordActivity, DiscordChannel,
-                                DiscordPostStyle)
+                                DiscordPostStyle, RequestPriority)
 from bgstally.debug import Debug
 from bgstally.formatters.base import BaseActivityFormatterInterface
 from bgstally.utils import _, __, human_format
@@ -130,7 +130,7 @@ class WindowActivity:
 
             if self.bgstally.state.ShowZeroActivitySystems.get() == CheckStates.STATE_OFF \
                 and system['zero_system_activity'] \
-                and str(system_id) != self.bgstally.state.current_system_id:
+                and system_id != self.bgstally.state.current_system_id:
                 continue
 
             tab:ttk.Frame = ttk.Frame(nb_tab)
@@ -394,20 +394,19 @@ class WindowActivity:
         if formatter.get_mode() == DiscordPostStyle.TEXT:
             if self.bgstally.state.DiscordActivity.get() != DiscordActivity.THARGOIDWAR:
                 discord_text: str = formatter.get_text(activity, DiscordActivity.BGS, lang=self.bgstally.state.discord_lang)
-                self.bgstally.discord.post_plaintext(discord_text, activity.discord_webhook_data, DiscordChannel.BGS, self.discord_post_complete)
+                self.bgstally.discord.post_plaintext(discord_text, activity.discord_webhook_data, DiscordChannel.BGS, self.discord_post_complete, RequestPriority.INTERACTIVE)
             if self.bgstally.state.DiscordActivity.get() != DiscordActivity.BGS:
                 discord_text = formatter.get_text(activity, DiscordActivity.THARGOIDWAR, lang=self.bgstally.state.discord_lang)
-                self.bgstally.discord.post_plaintext(discord_text, activity.discord_webhook_data, DiscordChannel.THARGOIDWAR, self.discord_post_complete)
+                self.bgstally.discord.post_plaintext(discord_text, activity.discord_webhook_data, DiscordChannel.THARGOIDWAR, self.discord_post_complete, RequestPriority.INTERACTIVE)
         else:
             description = "" if activity.discord_notes is None else activity.discord_notes
             if self.bgstally.state.DiscordActivity.get() != DiscordActivity.THARGOIDWAR:
                 discord_fields: dict = formatter.get_fields(activity, DiscordActivity.BGS, lang=self.bgstally.state.discord_lang)
-                self.bgstally.discord.post_embed(__("BGS Activity after Tick: {tick_time}", lang=self.bgstally.state.discord_lang).format(tick_time=activity.get_title(True)), description, discord_fields, activity.discord_webhook_data, DiscordChannel.BGS, self.discord_post_complete) # LANG: Discord post title
+                self.bgstally.discord.post_embed(__("BGS Activity after Tick: {tick_time}", lang=self.bgstally.state.discord_lang).format(tick_time=activity.get_title(True)), description, discord_fields, activity.discord_webhook_data, DiscordChannel.BGS, self.discord_post_complete, RequestPriority.INTERACTIVE) # LANG: Discord post title
             if self.bgstally.state.DiscordActivity.get() != DiscordActivity.BGS:
                 discord_fields = formatter.get_fields(activity, DiscordActivity.THARGOIDWAR, lang=self.bgstally.state.discord_lang)
-                self.bgstally.discord.post_embed(__("TW Activity after Tick: {tick_time}", lang=self.bgstally.state.discord_lang).format(tick_time=activity.get_title(True)), description, discord_fields, activity.discord_webhook_data, DiscordChannel.THARGOIDWAR, self.discord_post_complete) # LANG: Discord post title
+                self.bgstally.discord.post_embed(__("TW Activity after Tick: {tick_time}", lang=self.bgstally.state.discord_lang).format(tick_time=activity.get_title(True)), description, discord_fields, activity.discord_webhook_data, DiscordChannel.THARGOIDWAR, self.discord_post_complete, RequestPriority.INTERACTIVE) # LANG: Discord post title
 
-        activity.dirty = True # Because discord post ID has been changed
 
         self.btn_post_to_discord.after(5000, self._enable_post_button)
 
@@ -426,9 +425,14 @@ class WindowActivity:
         uuid:str = webhook_data.get('uuid')
         if uuid is None: return
 
-        activity_webhook_data:dict = self.activity.discord_webhook_data.get(uuid, webhook_data) # Fetch current activity webhook data, default to data from callback.
-        activity_webhook_data[channel] = messageid                                              # Store the returned messageid against the channel
-        self.activity.discord_webhook_data[uuid] = activity_webhook_data                        # Store the webhook dict back to the activity
+        # Called from a request thread, so hold the save lock while changing the activity
+        with self.bgstally.save_manager.lock:
+            activity_webhook_data:dict = self.activity.discord_webhook_data.get(uuid, webhook_data) # Fetch current activity webhook data, default to data from callback.
+            activity_webhook_data[channel] = messageid                                              # Store the returned messageid against the channel
+            self.activity.discord_webhook_data[uuid] = activity_webhook_data                        # Store the webhook dict back to the activity
+            self.activity.dirty = True
+
+        self.bgstally.save_manager.queue_save()
 
 
     def _pin_overlay_change(self, chk_pin_to_overlay:ttk.Checkbutton, system:dict):
@@ -440,6 +444,7 @@ class WindowActivity:
             system (dict): The system state dict
         """
         system['PinToOverlay'] = CheckStates.STATE_ON if chk_pin_to_overlay.instate(['selected']) else CheckStates.STATE_OFF
+        self._activity_changed(self.activity, system)
 
 
     def _discord_notes_change(self, DiscordNotesText, activity: Activity, *args):
@@ -449,7 +454,7 @@ class WindowActivity:
         activity.discord_notes = DiscordNotesText.get("1.0", "end-1c")
         self._update_discord_field(activity)
         DiscordNotesText.edit_modified(False) # Ensures the <<Modified>> event is triggered next edit
-        activity.dirty = True
+        self._activity_changed(activity)
 
 
     def _option_change(self, activity: Activity):
@@ -468,7 +473,7 @@ class WindowActivity:
         faction['Enabled'] = CheckStates.STATE_ON if FactionEnableCheckbuttons[faction_index].instate(['selected']) else CheckStates.STATE_OFF
         self._update_enable_all_factions_checkbutton(notebook, tab_index, EnableAllCheckbutton, FactionEnableCheckbuttons, system)
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity, system)
 
 
     def _enable_all_factions_change(self, notebook: ScrollableNotebook, tab_index: int, EnableAllCheckbutton, FactionEnableCheckbuttons, activity: Activity, system, *args):
@@ -495,7 +500,7 @@ class WindowActivity:
 
         self._update_tab_image(notebook, tab_index, EnableAllCheckbutton, system)
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity, system)
 
 
     def _enable_settlement_change(self, SettlementCheckbutton, settlement_name, activity: Activity, faction, faction_index, *args):
@@ -504,7 +509,19 @@ class WindowActivity:
         """
         faction['GroundCZSettlements'][settlement_name]['enabled'] = CheckStates.STATE_ON if SettlementCheckbutton.instate(['selected']) else CheckStates.STATE_OFF
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity)
+
+
+    def _activity_changed(self, activity: Activity, system: dict|None = None):
+        """
+        The user has edited the activity. Flag the changed system, or the whole activity if no system is given, to be
+        saved, and queue a save.
+        """
+        with self.bgstally.save_manager.lock:
+            if system is None: activity.dirty = True
+            else: activity.system_changed(system)
+
+        self.bgstally.save_manager.queue_save()
 
 
     def _update_enable_all_factions_checkbutton(self, notebook: ScrollableNotebook, tab_index: int, EnableAllCheckbutton, FactionEnableCheckbuttons, system):
@@ -564,10 +581,10 @@ class WindowActivity:
         elif cz_type == CZs.GROUND_HIGH:
             faction['GroundCZ']['h'] = CZVar.get()
 
-        activity.recalculate_zero_activity()
+        activity.recalculate_system_zero_activity(system)
         self._update_tab_image(notebook, tab_index, EnableAllCheckbutton, system)
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity, system)
 
 
     def _mission_points_change(self, notebook: ScrollableNotebook, tab_index: int, MissionPointsVar: tk.IntVar, primary, EnableAllCheckbutton, activity: Activity, system, faction, faction_index, *args):
@@ -579,10 +596,10 @@ class WindowActivity:
         else:
             faction['MissionPointsSecondary']['m'] = MissionPointsVar.get()
 
-        activity.recalculate_zero_activity()
+        activity.recalculate_system_zero_activity(system)
         self._update_tab_image(notebook, tab_index, EnableAllCheckbutton, system)
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity, system)
 
 
     def _scenarios_change(self, notebook: ScrollableNotebook, tab_index: int, ScenariosVar: tk.IntVar, EnableAllCheckbutton, activity: Activity, system, faction, faction_index, *args):
@@ -591,10 +608,10 @@ class WindowActivity:
         """
         faction['Scenarios'] = ScenariosVar.get()
 
-        activity.recalculate_zero_activity()
+        activity.recalculate_system_zero_activity(system)
         self._update_tab_image(notebook, tab_index, EnableAllCheckbutton, system)
         self._update_discord_field(activity)
-        activity.dirty = True
+        self._activity_changed(activity, system)
 
 
     def _update_tab_image(self, notebook: ScrollableNotebook, tab_index: int, EnableAllCheckbutton, system: dict):
@@ -6,7 +6,7 @@ import webbrowser
 from os import path
 
 from bgstally.api import API
-from bgstally.constants import FOLDER_ASSETS, FONT_HEADING_2
+from bgstally.constants import FOLDER_ASSETS, FONT_HEADING_2, RequestPriority
 from bgstally.debug import Debug
 from bgstally.utils import _
 from bgstally.widgets import CollapsibleFrame, EntryPlus, HyperlinkManager
@@ -165,6 +165,7 @@ class WindowAPI:
         self.api.key = self.entry_apikey.get()
         self.api.activities_enabled = self.cb_apiactivities.instate(['selected'])
         self.api.events_enabled = self.cb_apievents.instate(['selected'])
+        self.api.dirty = True
         self._update()
 
 
@@ -222,7 +223,7 @@ class WindowAPI:
         The user has clicked the 'Establish Connection' button
         """
         self.btn_fetch.configure(state='disabled')
-        self.api.discover(self.discovery_received)
+        self.api.discover(self.discovery_received, RequestPriority.INTERACTIVE)
 
 
     def discovery_received(self, success:bool, response:Response, request:BGSTallyRequest):
@@ -240,6 +241,7 @@ class WindowAPI:
         User has clicked the approve button
         """
         self.api.user_approved = True
+        self.api.dirty = True
         self._update()
         self.toplevel.after(1000, partial(self.toplevel.destroy))
 
@@ -253,5 +255,6 @@ class WindowAPI:
         User has clicked the don't approve button
         """
         self.api.user_approved = False
+        self.api.dirty = True
         self._update()
         self.toplevel.after(1000, partial(self.toplevel.destroy))
@@ -6,13 +6,14 @@ from urllib.parse import quote
 
 from ttkHyperlinkLabel import HyperlinkLabel
 
-from bgstally.constants import COLOUR_HEADING_1, DATETIME_FORMAT_JOURNAL, FONT_HEADING_1, FONT_HEADING_2, DiscordChannel
+from bgstally.constants import COLOUR_HEADING_1, DATETIME_FORMAT_JOURNAL, FONT_HEADING_1, FONT_HEADING_2, DiscordChannel, RequestPriority
 from bgstally.debug import Debug
 from bgstally.utils import _, __
 from bgstally.widgets import TreeviewPlus
 from thirdparty.colors import *
 
 DATETIME_FORMAT_CMDRLIST = "%Y-%m-%d %H:%M:%S"
+LIST_PAGE_SIZE = 200
 
 
 class WindowCMDRs:
@@ -68,7 +69,7 @@ class WindowCMDRs:
         treeview.bind('<<TreeviewSelect>>', partial(self._cmdr_selection_changed, treeview))
         sb_treeview: tk.Scrollbar = tk.Scrollbar(frm_list, orient=tk.VERTICAL, command=treeview.yview)
         sb_treeview.pack(fill=tk.Y, side=tk.RIGHT)
-        treeview.configure(yscrollcommand=sb_treeview.set)
+        treeview.configure(yscrollcommand=treeview.paged_yscrollcommand(sb_treeview.set))
         treeview.pack(fill=tk.BOTH, expand=1)
 
         current_row = 0
@@ -93,15 +94,8 @@ class WindowCMDRs:
             treeview.heading(column['title'], text=column['title'].title(), sort_by=column['type'])
             treeview.column(column['title'], anchor=column['align'], stretch=column['stretch'], width=column['width'])
 
-        for target in reversed(self.target_data):
-            target_values = [target.get('TargetName', "----"), \
-                             target.get('System', "----"), \
-                             target.get('SquadronID', "----"), \
-                             target.get('Ship', "----"), \
-                             target.get('LegalStatus', "----"), \
-                             datetime.strptime(target['Timestamp'], DATETIME_FORMAT_JOURNAL).strftime(DATETIME_FORMAT_CMDRLIST), \
-                             self.bgstally.target_manager.get_human_readable_reason(target.get('Reason'), False)]
-            treeview.insert("", 'end', values=target_values, iid=target.get('index'))
+        # Only build rows as they are needed, the target log can be very large
+        treeview.insert_paged(self.target_data[::-1], self._get_target_row, LIST_PAGE_SIZE)
 
         self.btn_copy_to_clipboard: tk.Button = tk.Button(frm_buttons, text=_("Copy to Clipboard"), command=partial(self._copy_to_clipboard, frm_container)) # LANG: Button label
         self.btn_copy_to_clipboard.pack(side=tk.LEFT, padx=5, pady=5)
@@ -116,6 +110,20 @@ class WindowCMDRs:
         self.btn_delete['state'] = tk.DISABLED
 
 
+    def _get_target_row(self, target:dict) -> tuple:
+        """
+        Get the list row for a target, as an (iid, values) tuple
+        """
+        target_values = [target.get('TargetName', "----"), \
+                         target.get('System', "----"), \
+                         target.get('SquadronID', "----"), \
+                         target.get('Ship', "----"), \
+                         target.get('LegalStatus', "----"), \
+                         datetime.strptime(target['Timestamp'], DATETIME_FORMAT_JOURNAL).strftime(DATETIME_FORMAT_CMDRLIST), \
+                         self.bgstally.target_manager.get_human_readable_reason(target.get('Reason'), False)]
+        return self.bgstally.target_manager.get_target_row_id(target), target_values
+
+
     def _cmdr_selected(self, values, column, treeview:TreeviewPlus, iid:str):
         """
         A CMDR row has been clicked in the list, show details
@@ -126,8 +134,9 @@ class WindowCMDRs:
         self.lbl_cmdr_details_squadron_inara.configure(text = "", url = "")
         self.lbl_cmdr_details_interaction.configure(text = "")
 
-        # Fetch the info for this CMDR. iid is the index into the original (unsorted) CMDR list.
-        self.selected_cmdr = self.target_data[int(iid)]
+        # Fetch the info for this CMDR. iid is the target's row ID in the target log.
+        self.selected_cmdr = self.bgstally.target_manager.get_target_by_row_id(iid)
+        if self.selected_cmdr is None: return
 
         if 'TargetName' in self.selected_cmdr: self.lbl_cmdr_details_name.config(text=self.selected_cmdr.get('TargetName'))
         if 'inaraURL' in self.selected_cmdr: self.lbl_cmdr_details_name_inara.configure(text=_("Inara Info Available ⤴"), url=self.selected_cmdr.get('inaraURL')) # LANG: Inara URL on CMDR window
@@ -176,12 +185,13 @@ class WindowCMDRs:
         Delete the currently selected CMDRs
         """
         selected_items:list = treeview.selection()
+        deleted_targets:list = []
         for selected_iid in selected_items:
-           for i in range(len(self.target_data)):
-               if int(self.target_data[i]['index']) == int(selected_iid):
-                   self.target_data.pop(i) # Remove the corresponding item
-                   break
-           treeview.delete(int(selected_iid))
+           target:dict|None = self.bgstally.target_manager.get_target_by_row_id(selected_iid)
+           if target is not None: deleted_targets.append(target)
+           treeview.delete(selected_iid)
+
+        self.bgstally.target_manager.delete_targets(deleted_targets)
 
         self.selected_cmdr = None
         self._cmdr_selection_changed(treeview)
@@ -225,7 +235,7 @@ class WindowCMDRs:
         fields: list = self._get_cmdr_as_discord_fields(self.selected_cmdr)
         description: str = f"```ansi\n{self.bgstally.target_manager.get_human_readable_reason(self.selected_cmdr.get('Reason'), True)}\n```"
 
-        self.bgstally.discord.post_embed(f"CMDR {self.selected_cmdr.get('TargetName')}", description, fields, None, DiscordChannel.CMDR_INFORMATION, None)
+        self.bgstally.discord.post_embed(f"CMDR {self.selected_cmdr.get('TargetName')}", description, fields, None, DiscordChannel.CMDR_INFORMATION, None, RequestPriority.INTERACTIVE)
 
 
     def _post_multiple_CMDRs_to_discord(self):
@@ -239,11 +249,10 @@ class WindowCMDRs:
                 text += "[...]"
                 break
 
-            for cmdr in self.target_data:
-                if int(cmdr['index']) == int(selected_iid):
-                    text += self._get_cmdr_as_text(cmdr) + "\n"
+            cmdr:dict|None = self.bgstally.target_manager.get_target_by_row_id(selected_iid)
+            if cmdr is not None: text += self._get_cmdr_as_text(cmdr) + "\n"
 
-        self.bgstally.discord.post_plaintext(text, None, DiscordChannel.CMDR_INFORMATION, None)
+        self.bgstally.discord.post_plaintext(text, None, DiscordChannel.CMDR_INFORMATION, None, RequestPriority.INTERACTIVE)
 
 
     def _get_cmdr_as_discord_fields(self, cmdr_info: dict) -> list:
@@ -342,9 +351,8 @@ class WindowCMDRs:
         text: str = ""
 
         for selected_iid in self.selected_items:
-            for cmdr in self.target_data:
-                if int(cmdr['index']) == int(selected_iid):
-                    text += self._get_cmdr_as_text(cmdr) + "\n"
+            cmdr:dict|None = self.bgstally.target_manager.get_target_by_row_id(selected_iid)
+            if cmdr is not None: text += self._get_cmdr_as_text(cmdr) + "\n"
 
         frm_container.clipboard_clear()
         frm_container.clipboard_append(text)